@@ -0,0 +1,36 @@
+import argparse
+import csv
+
+from wordmem.utils.OfflineDictUtil import build_dict
+
+
+def read_entries(path):
+    """
+    读取英汉词表，支持两种格式：
+    - ECDICT 的 CSV（含 word 和 translation 列）
+    - 每行 "单词<TAB>释义" 的 TSV
+    """
+    csv.field_size_limit(2 ** 31 - 1)
+    with open(path, 'r', encoding='utf-8', newline='') as f:
+        if path.endswith('.csv'):
+            for row in csv.DictReader(f):
+                # ECDICT 中的多条释义以字面量 \n 分隔
+                yield row.get('word', ''), (row.get('translation') or '').replace('\\n', '\n').strip()
+        else:
+            for line in f:
+                word, _, translation = line.rstrip('\r\n').partition('\t')
+                yield word, translation.strip()
+
+
+def main():
+    parser = argparse.ArgumentParser(description='生成离线词典文件')
+    parser.add_argument('source', help='英汉词表（ECDICT CSV 或 TSV）')
+    parser.add_argument('output', nargs='?', default='dict/ecdict.bin', help='输出文件')
+    args = parser.parse_args()
+
+    count = build_dict(read_entries(args.source), args.output)
+    print(f"已生成离线词典: {args.output}（{count} 个词条）")
+
+
+if __name__ == '__main__':
+    main()
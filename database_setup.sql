@@ -24,26 +24,157 @@ CREATE TABLE IF NOT EXISTS words (
 );
 
 -- 创建索引以提高查询性能
-CREATE INDEX idx_words_user_id ON words(user_id);
-CREATE INDEX idx_words_next_review ON words(next_review);
-CREATE INDEX idx_users_username ON users(username);
+CREATE INDEX IF NOT EXISTS idx_words_user_id ON words(user_id);
+CREATE INDEX IF NOT EXISTS idx_words_next_review ON words(next_review);
+CREATE INDEX IF NOT EXISTS idx_users_username ON users(username);
+-- 导出时按 (user_id, id) 做 keyset 分页
+CREATE INDEX IF NOT EXISTS idx_words_user_id_id ON words(user_id, id);
 
 -- 启用行级安全性（RLS）
 ALTER TABLE users ENABLE ROW LEVEL SECURITY;
 ALTER TABLE words ENABLE ROW LEVEL SECURITY;
 
--- 创建策略：用户只能访问自己的数据
+-- 创建策略：用户只能访问自己的数据（先删除同名策略，整个脚本可以重复执行）
+DROP POLICY IF EXISTS "Users can view own profile" ON users;
 CREATE POLICY "Users can view own profile" ON users
     FOR SELECT USING (auth.uid()::text = id::text);
 
+DROP POLICY IF EXISTS "Users can view own words" ON words;
 CREATE POLICY "Users can view own words" ON words
     FOR SELECT USING (auth.uid()::text = user_id::text);
 
+DROP POLICY IF EXISTS "Users can insert own words" ON words;
 CREATE POLICY "Users can insert own words" ON words
     FOR INSERT WITH CHECK (auth.uid()::text = user_id::text);
 
+DROP POLICY IF EXISTS "Users can update own words" ON words;
 CREATE POLICY "Users can update own words" ON words
     FOR UPDATE USING (auth.uid()::text = user_id::text);
 
+DROP POLICY IF EXISTS "Users can delete own words" ON words;
 CREATE POLICY "Users can delete own words" ON words
-    FOR DELETE USING (auth.uid()::text = user_id::text);
\ No newline at end of file
+    FOR DELETE USING (auth.uid()::text = user_id::text);
+
+-- ============ 共享词库 ============
+
+-- 词库（由老师创建）
+CREATE TABLE IF NOT EXISTS decks (
+    id UUID DEFAULT gen_random_uuid() PRIMARY KEY,
+    owner_id UUID REFERENCES users(id) ON DELETE CASCADE,
+    name TEXT NOT NULL,
+    created_at TIMESTAMP WITH TIME ZONE DEFAULT CURRENT_TIMESTAMP
+);
+
+-- 词库中的单词
+CREATE TABLE IF NOT EXISTS deck_words (
+    deck_id UUID REFERENCES decks(id) ON DELETE CASCADE,
+    word TEXT NOT NULL,
+    translation TEXT NOT NULL,
+    type VARCHAR(20) DEFAULT 'word',
+    PRIMARY KEY (deck_id, word)
+);
+
+-- 订阅关系：sync_deck 据此找到需要同步的学生
+CREATE TABLE IF NOT EXISTS deck_subscriptions (
+    deck_id UUID REFERENCES decks(id) ON DELETE CASCADE,
+    user_id UUID REFERENCES users(id) ON DELETE CASCADE,
+    PRIMARY KEY (deck_id, user_id)
+);
+
+-- 升级旧版本：同步改为每次复制整个词库后不再需要的列，以及没有归属检查的旧函数
+ALTER TABLE deck_words DROP COLUMN IF EXISTS added_at;
+ALTER TABLE deck_subscriptions DROP COLUMN IF EXISTS last_synced_at;
+DROP FUNCTION IF EXISTS clone_deck(UUID, UUID[]);
+DROP FUNCTION IF EXISTS sync_deck(UUID);
+
+CREATE INDEX IF NOT EXISTS idx_decks_owner_id ON decks(owner_id);
+CREATE INDEX IF NOT EXISTS idx_deck_subscriptions_user_id ON deck_subscriptions(user_id);
+
+-- 启用行级安全性（RLS）
+ALTER TABLE decks ENABLE ROW LEVEL SECURITY;
+ALTER TABLE deck_words ENABLE ROW LEVEL SECURITY;
+ALTER TABLE deck_subscriptions ENABLE ROW LEVEL SECURITY;
+
+-- 创建策略：只有词库的创建者可以管理词库和其中的单词
+DROP POLICY IF EXISTS "Owners can manage own decks" ON decks;
+CREATE POLICY "Owners can manage own decks" ON decks
+    FOR ALL USING (auth.uid()::text = owner_id::text)
+    WITH CHECK (auth.uid()::text = owner_id::text);
+
+DROP POLICY IF EXISTS "Owners can manage own deck words" ON deck_words;
+CREATE POLICY "Owners can manage own deck words" ON deck_words
+    FOR ALL USING (EXISTS (
+        SELECT 1 FROM decks d WHERE d.id = deck_id AND auth.uid()::text = d.owner_id::text))
+    WITH CHECK (EXISTS (
+        SELECT 1 FROM decks d WHERE d.id = deck_id AND auth.uid()::text = d.owner_id::text));
+
+-- 订阅只能通过 clone_deck 写入；学生可以查看自己的订阅，创建者可以查看词库的订阅
+DROP POLICY IF EXISTS "Users can view own subscriptions" ON deck_subscriptions;
+CREATE POLICY "Users can view own subscriptions" ON deck_subscriptions
+    FOR SELECT USING (auth.uid()::text = user_id::text OR EXISTS (
+        SELECT 1 FROM decks d WHERE d.id = deck_id AND auth.uid()::text = d.owner_id::text));
+
+-- 检查调用者是否为词库的创建者
+-- 使用 service_role key 的客户端没有 auth.uid()，以传入的 p_owner_id 作为调用者
+CREATE OR REPLACE FUNCTION check_deck_owner(p_deck_id UUID, p_owner_id UUID)
+RETURNS VOID
+LANGUAGE plpgsql SECURITY DEFINER SET search_path = public AS $$
+DECLARE
+    v_caller UUID := CASE WHEN auth.role() = 'service_role' THEN p_owner_id ELSE auth.uid() END;
+BEGIN
+    IF v_caller IS NULL OR NOT EXISTS (
+        SELECT 1 FROM decks d WHERE d.id = p_deck_id AND d.owner_id = v_caller
+    ) THEN
+        RAISE EXCEPTION '无权操作该词库' USING ERRCODE = '42501';
+    END IF;
+END;
+$$;
+
+-- 把词库复制到每个学生的生词本
+-- 每个学生只执行一条 INSERT ... SELECT ... ON CONFLICT DO NOTHING，
+-- 每次都复制整个词库：已有的单词由唯一约束跳过，因此重复执行也不会丢失或重复单词
+-- 以 SECURITY DEFINER 运行才能写入学生的 words，调用前先检查词库归属
+CREATE OR REPLACE FUNCTION clone_deck(p_deck_id UUID, p_user_ids UUID[], p_owner_id UUID DEFAULT NULL)
+RETURNS TABLE (student_id UUID, inserted_count INTEGER, skipped_count INTEGER)
+LANGUAGE plpgsql SECURITY DEFINER SET search_path = public AS $$
+DECLARE
+    v_user UUID;
+    v_total INTEGER;
+BEGIN
+    PERFORM check_deck_owner(p_deck_id, p_owner_id);
+
+    SELECT count(*) INTO v_total FROM deck_words dw WHERE dw.deck_id = p_deck_id;
+
+    FOREACH v_user IN ARRAY p_user_ids LOOP
+        INSERT INTO words (user_id, word, translation, type)
+        SELECT v_user, dw.word, dw.translation, dw.type
+        FROM deck_words dw
+        WHERE dw.deck_id = p_deck_id
+        ON CONFLICT (user_id, word) DO NOTHING;
+
+        GET DIAGNOSTICS inserted_count = ROW_COUNT;
+        skipped_count := v_total - inserted_count;
+
+        INSERT INTO deck_subscriptions (deck_id, user_id)
+        VALUES (p_deck_id, v_user)
+        ON CONFLICT (deck_id, user_id) DO NOTHING;
+
+        student_id := v_user;
+        RETURN NEXT;
+    END LOOP;
+END;
+$$;
+
+-- 老师追加单词后，把词库重新同步给所有已订阅的学生
+CREATE OR REPLACE FUNCTION sync_deck(p_deck_id UUID, p_owner_id UUID DEFAULT NULL)
+RETURNS TABLE (student_id UUID, inserted_count INTEGER, skipped_count INTEGER)
+LANGUAGE sql SECURITY DEFINER SET search_path = public AS $$
+    SELECT * FROM clone_deck(
+        p_deck_id,
+        ARRAY(SELECT user_id FROM deck_subscriptions WHERE deck_id = p_deck_id),
+        p_owner_id
+    );
+$$;
+
+-- 归属检查只供上面两个函数使用
+REVOKE EXECUTE ON FUNCTION check_deck_owner(UUID, UUID) FROM PUBLIC, anon, authenticated;
@@ -1,271 +1,75 @@
 import sys
 import os
-import json
-import hashlib
-from datetime import datetime, timedelta
+import tempfile
+import multiprocessing
 from PyQt6.QtWidgets import *
 from PyQt6.QtCore import *
 from PyQt6.QtGui import *
-import requests
-from supabase import create_client, Client
 import random
-try:
-    from translator_free import FreeTranslator
-except ImportError:
-    FreeTranslator = None
+from wordmem import Config, DatabaseManager, Translator
 
-# 配置文件
-CONFIG_FILE = "config.json"
 
-class Config:
-    """配置管理类"""
-    def __init__(self):
-        self.supabase_url = ""
-        self.supabase_key = ""
-        self.youdao_app_key = ""
-        self.youdao_app_secret = ""
-        self.load_config()
-    
-    def load_config(self):
-        if os.path.exists(CONFIG_FILE):
-            with open(CONFIG_FILE, 'r', encoding='utf-8') as f:
-                data = json.load(f)
-                self.supabase_url = data.get('supabase_url', '')
-                self.supabase_key = data.get('supabase_key', '')
-                self.youdao_app_key = data.get('youdao_app_key', '')
-                self.youdao_app_secret = data.get('youdao_app_secret', '')
-    
-    def save_config(self):
-        data = {
-            'supabase_url': self.supabase_url,
-            'supabase_key': self.supabase_key,
-            'youdao_app_key': self.youdao_app_key,
-            'youdao_app_secret': self.youdao_app_secret
-        }
-        with open(CONFIG_FILE, 'w', encoding='utf-8') as f:
-            json.dump(data, f, ensure_ascii=False, indent=2)
-
-class DatabaseManager:
-    """数据库管理类"""
-    def __init__(self, config):
-        self.config = config
-        self.supabase = None
-        self.user_id = None
-        
-    def connect(self):
-        """连接到 Supabase"""
-        if self.config.supabase_url and self.config.supabase_key:
-            self.supabase = create_client(self.config.supabase_url, self.config.supabase_key)
-            return True
-        return False
-    
-    def login(self, username, password):
-        """用户登录"""
-        if not self.supabase:
-            return False, "数据库未连接"
-        
-        try:
-            # 查询用户
-            result = self.supabase.table('users').select("*").eq('username', username).execute()
-            
-            if not result.data:
-                return False, "用户不存在"
-            
-            user = result.data[0]
-            # 简单的密码验证（实际应用中应使用更安全的方式）
-            password_hash = hashlib.sha256(password.encode()).hexdigest()
-            
-            if user['password_hash'] == password_hash:
-                self.user_id = user['id']
-                return True, "登录成功"
-            else:
-                return False, "密码错误"
-                
-        except Exception as e:
-            return False, f"登录失败: {str(e)}"
-    
-    def register(self, username, password):
-        """用户注册"""
-        if not self.supabase:
-            return False, "数据库未连接"
-        
-        try:
-            # 检查用户名是否存在
-            result = self.supabase.table('users').select("*").eq('username', username).execute()
-            
-            if result.data:
-                return False, "用户名已存在"
-            
-            # 创建新用户
-            password_hash = hashlib.sha256(password.encode()).hexdigest()
-            user_data = {
-                'username': username,
-                'password_hash': password_hash,
-                'created_at': datetime.now().isoformat()
-            }
-            
-            result = self.supabase.table('users').insert(user_data).execute()
-            
-            if result.data:
-                return True, "注册成功"
-            else:
-                return False, "注册失败"
-                
-        except Exception as e:
-            return False, f"注册失败: {str(e)}"
-    
-    def add_word(self, word, translation, word_type='word'):
-        """添加单词或短语"""
-        if not self.supabase or not self.user_id:
-            return False, "请先登录"
-        
-        try:
-            word_data = {
-                'user_id': self.user_id,
-                'word': word,
-                'translation': translation,
-                'type': word_type,
-                'created_at': datetime.now().isoformat(),
-                'review_count': 0,
-                'last_review': None,
-                'next_review': datetime.now().isoformat()
-            }
-            
-            result = self.supabase.table('words').insert(word_data).execute()
-            
-            if result.data:
-                return True, "添加成功"
-            else:
-                return False, "添加失败"
-                
-        except Exception as e:
-            return False, f"添加失败: {str(e)}"
-    
-    def get_words_for_review(self):
-        """获取需要复习的单词"""
-        if not self.supabase or not self.user_id:
-            return []
-        
+class ImageTranslateWorker(QThread):
+    """在后台线程中完成图片取词，避免阻塞界面"""
+    result_ready = pyqtSignal(list, str)
+
+    def __init__(self, translator, path):
+        super().__init__()
+        self.translator = translator
+        self.path = path
+
+    def run(self):
+        # 无论成功与否都要发出信号，否则界面上的按钮会一直处于禁用状态
         try:
-            # 获取今天需要复习的单词
-            today = datetime.now().isoformat()
-            result = self.supabase.table('words').select("*").eq('user_id', self.user_id).lte('next_review', today).execute()
-            
-            return result.data if result.data else []
-            
+            words, error = self.translator.translate_image(self.path)
         except Exception as e:
-            print(f"获取复习单词失败: {str(e)}")
-            return []
-    
-    def update_review(self, word_id, remembered):
-        """更新复习记录"""
-        if not self.supabase:
-            return False
-        
+            words, error = [], f"识别失败: {str(e)}"
+        self.result_ready.emit(words or [], error or '')
+
+class BackupWorker(QThread):
+    """在后台线程中导出或恢复数据，func 为 export_table / restore_table"""
+    progress = pyqtSignal(int)
+    result_ready = pyqtSignal(bool, str)
+
+    def __init__(self, func, table, path):
+        super().__init__()
+        self.func = func
+        self.table = table
+        self.path = path
+
+    def run(self):
         try:
-            # 获取当前单词信息
-            result = self.supabase.table('words').select("*").eq('id', word_id).execute()
-            
-            if not result.data:
-                return False
-            
-            word = result.data[0]
-            review_count = word['review_count'] + 1
-            
-            # 根据记忆情况计算下次复习时间
-            if remembered:
-                # 记住了，增加间隔时间
-                days = min(2 ** review_count, 30)  # 最多30天
-            else:
-                # 没记住，重置
-                days = 1
-                review_count = 0
-            
-            next_review = (datetime.now() + timedelta(days=days)).isoformat()
-            
-            # 更新数据
-            update_data = {
-                'review_count': review_count,
-                'last_review': datetime.now().isoformat(),
-                'next_review': next_review
-            }
-            
-            self.supabase.table('words').update(update_data).eq('id', word_id).execute()
-            
-            return True
-            
+            success, message = self.func(self.table, self.path, progress=self.progress.emit)
         except Exception as e:
-            print(f"更新复习记录失败: {str(e)}")
-            return False
-from utils.AuthV3Util import addAuthParams
-class Translator:
-    """翻译类"""
-    def __init__(self, config):
-        self.config = config
-        self.free_translator = FreeTranslator() if FreeTranslator else None
-    
-    def translate_youdao(self, text):
-        """使用有道翻译API"""
-        if not self.config.youdao_app_key or not self.config.youdao_app_secret:
-            return None, "未配置有道翻译API"
-        
-        try:
-            import uuid
-            import time
-            
-            app_key = self.config.youdao_app_key
-            app_secret = self.config.youdao_app_secret
-            
-            # # 生成参数
-            # salt = str(uuid.uuid4())
-            # curtime = str(int(time.time()))
-            #
-            # # 生成签名
-            # sign_str = app_key + text + salt + curtime + app_secret
-            # sign = hashlib.sha256(sign_str.encode()).hexdigest()
-            #
-            # 请求参数
-            params = {
-                'q': text,
-                'from': 'auto',
-                'to': 'zh-CHS',
-            }
+            success, message = False, str(e)
+        self.result_ready.emit(success, message)
 
-            addAuthParams(app_key, app_secret, params)
-
-            # 发送请求
-            response = requests.post('https://openapi.youdao.com/api', params=params, timeout=5)
-            result = response.json()
-            
-            if result.get('errorCode') == '0':
-                translation = result.get('translation', [''])[0]
-                return translation, None
-            else:
-                return None, f"翻译失败: {result.get('errorCode')}"
-                
-        except Exception as e:
-            return None, f"翻译失败: {str(e)}"
-    
-    def translate_simple(self, word):
-        """简单的单词翻译（可以后续接入词典API）"""
-        # 这里可以集成免费的词典API或者本地词典
-        # 暂时返回示例
-        return f"{word} 的中文翻译", None
-    
-    def translate(self, text):
-        """统一的翻译接口"""
-        # 优先使用免费翻译
-        if self.free_translator:
-            result, error = self.free_translator.translate(text)
-            if result:
-                return result, None
-        
-        # 如果免费翻译失败，尝试有道翻译
-        if self.config.youdao_app_key:
-            return self.translate_youdao(text)
-        
-        # 最后使用简单翻译
-        return self.translate_simple(text)
+class EssayIndexWorker(QThread):
+    """在后台线程中同步或重建作文索引"""
+    result_ready = pyqtSignal(bool, str)
+
+    def __init__(self, db_manager, rebuild):
+        super().__init__()
+        self.db_manager = db_manager
+        self.rebuild = rebuild
+
+    def run(self):
+        success, message = self.db_manager.sync_essay_index(self.rebuild)
+        self.result_ready.emit(success, message)
+
+class AuthWorker(QThread):
+    """在后台线程中执行登录或注册请求"""
+    result_ready = pyqtSignal(bool, str)
+
+    def __init__(self, func, username, password):
+        super().__init__()
+        self.func = func
+        self.username = username
+        self.password = password
+
+    def run(self):
+        success, message = self.func(self.username, self.password)
+        self.result_ready.emit(success, message)
 
 class LoginDialog(QDialog):
     """登录对话框"""
@@ -276,7 +80,7 @@ class LoginDialog(QDialog):
     
     def init_ui(self):
         self.setWindowTitle('登录')
-        self.setFixedSize(300, 200)
+        self.setFixedSize(300, 240)
         
         layout = QVBoxLayout()
         
@@ -303,6 +107,16 @@ class LoginDialog(QDialog):
         button_layout.addWidget(self.register_button)
         
         layout.addLayout(button_layout)
+
+        # 请求进行中的状态
+        self.progress_bar = QProgressBar()
+        self.progress_bar.setRange(0, 0)
+        self.progress_bar.setTextVisible(False)
+        self.progress_bar.hide()
+        layout.addWidget(self.progress_bar)
+
+        self.status_label = QLabel('')
+        layout.addWidget(self.status_label)
         
         self.setLayout(layout)
         
@@ -340,15 +154,35 @@ class LoginDialog(QDialog):
         self.login_button.setObjectName('login')
         self.register_button.setObjectName('register')
     
-    def login(self):
+    def set_busy(self, message):
+        """请求进行中时禁用输入，message 为空表示请求结束"""
+        busy = bool(message)
+        self.username_input.setEnabled(not busy)
+        self.password_input.setEnabled(not busy)
+        self.login_button.setEnabled(not busy)
+        self.register_button.setEnabled(not busy)
+        self.progress_bar.setVisible(busy)
+        self.status_label.setText(message)
+
+    def start_auth(self, func, message, on_finished):
+        """在后台线程中调用 func(username, password)"""
         username = self.username_input.text().strip()
         password = self.password_input.text().strip()
         
         if not username or not password:
             QMessageBox.warning(self, '提示', '请输入用户名和密码')
             return
-        
-        success, message = self.db_manager.login(username, password)
+
+        self.set_busy(message)
+        self.auth_worker = AuthWorker(func, username, password)
+        self.auth_worker.result_ready.connect(on_finished)
+        self.auth_worker.start()
+
+    def login(self):
+        self.start_auth(self.db_manager.login, '正在登录...', self.on_login_finished)
+
+    def on_login_finished(self, success, message):
+        self.set_busy('')
         
         if success:
             self.accept()
@@ -356,20 +190,22 @@ class LoginDialog(QDialog):
             QMessageBox.warning(self, '登录失败', message)
     
     def register(self):
-        username = self.username_input.text().strip()
-        password = self.password_input.text().strip()
-        
-        if not username or not password:
-            QMessageBox.warning(self, '提示', '请输入用户名和密码')
-            return
-        
-        success, message = self.db_manager.register(username, password)
+        self.start_auth(self.db_manager.register, '正在注册...', self.on_register_finished)
+
+    def on_register_finished(self, success, message):
+        self.set_busy('')
         
         if success:
             QMessageBox.information(self, '注册成功', '注册成功，请登录')
         else:
             QMessageBox.warning(self, '注册失败', message)
 
+    def reject(self):
+        # 请求进行中不允许关闭，避免线程在对话框销毁后仍在运行
+        if self.progress_bar.isVisible():
+            return
+        super().reject()
+
 class ConfigDialog(QDialog):
     """配置对话框"""
     def __init__(self, config):
@@ -454,6 +290,21 @@ class MainWindow(QMainWindow):
         config_action = QAction('配置', self)
         config_action.triggered.connect(self.show_config)
         toolbar.addAction(config_action)
+
+        self.export_action = QAction('导出', self)
+        self.export_action.triggered.connect(self.export_backup)
+        toolbar.addAction(self.export_action)
+
+        self.restore_action = QAction('恢复', self)
+        self.restore_action.triggered.connect(self.restore_backup)
+        toolbar.addAction(self.restore_action)
+
+        # 导出 / 恢复进度
+        self.backup_progress_bar = QProgressBar()
+        self.backup_progress_bar.setRange(0, 0)
+        self.backup_progress_bar.setMaximumWidth(150)
+        self.backup_progress_bar.hide()
+        self.statusBar().addPermanentWidget(self.backup_progress_bar)
         
         # 标签页
         self.tabs = QTabWidget()
@@ -466,6 +317,14 @@ class MainWindow(QMainWindow):
         # 复习页面
         self.review_tab = self.create_review_tab()
         self.tabs.addTab(self.review_tab, '每日复习')
+
+        # 图片取词页面
+        self.image_tab = self.create_image_tab()
+        self.tabs.addTab(self.image_tab, '图片取词')
+
+        # 作文页面
+        self.writing_tab = self.create_writing_tab()
+        self.tabs.addTab(self.writing_tab, '我的作文')
         
         # 设置样式
         self.setStyleSheet("""
@@ -521,6 +380,13 @@ class MainWindow(QMainWindow):
         self.word_input = QLineEdit()
         self.word_input.setPlaceholderText('输入单词或短语')
         input_layout.addWidget(self.word_input)
+
+        # 离线词典前缀补全
+        self.completer_model = QStringListModel()
+        completer = QCompleter(self.completer_model, self)
+        completer.setCaseSensitivity(Qt.CaseSensitivity.CaseInsensitive)
+        self.word_input.setCompleter(completer)
+        self.word_input.textEdited.connect(self.update_suggestions)
         
         translate_button = QPushButton('翻译')
         translate_button.clicked.connect(self.translate_word)
@@ -572,6 +438,17 @@ class MainWindow(QMainWindow):
             padding: 20px;
         """)
         layout.addWidget(self.review_translation_label)
+
+        # 作文中用过该单词的例句
+        self.review_context_label = QLabel('')
+        self.review_context_label.setAlignment(Qt.AlignmentFlag.AlignCenter)
+        self.review_context_label.setWordWrap(True)
+        self.review_context_label.setStyleSheet("""
+            font-size: 14px;
+            color: #888;
+            padding: 10px;
+        """)
+        layout.addWidget(self.review_context_label)
         
         # 按钮区域
         button_layout = QHBoxLayout()
@@ -602,6 +479,68 @@ class MainWindow(QMainWindow):
         
         return widget
     
+    def create_image_tab(self):
+        """创建图片取词标签页"""
+        widget = QWidget()
+        layout = QVBoxLayout()
+
+        # 按钮区域
+        button_layout = QHBoxLayout()
+
+        self.open_image_button = QPushButton('选择图片')
+        self.open_image_button.clicked.connect(self.open_image)
+        button_layout.addWidget(self.open_image_button)
+
+        self.paste_image_button = QPushButton('粘贴截图')
+        self.paste_image_button.clicked.connect(self.paste_image)
+        button_layout.addWidget(self.paste_image_button)
+
+        layout.addLayout(button_layout)
+
+        self.image_status_label = QLabel('选择课本照片或截图，识别其中的单词')
+        layout.addWidget(self.image_status_label)
+
+        # 识别结果，点击单词即可勾选
+        self.image_word_list = QListWidget()
+        self.image_word_list.itemClicked.connect(self.toggle_image_word)
+        layout.addWidget(self.image_word_list)
+
+        add_button = QPushButton('添加选中的单词')
+        add_button.clicked.connect(self.add_image_words)
+        layout.addWidget(add_button)
+
+        widget.setLayout(layout)
+
+        return widget
+
+    def create_writing_tab(self):
+        """创建作文标签页"""
+        widget = QWidget()
+        layout = QVBoxLayout()
+
+        self.essay_input = QTextEdit()
+        self.essay_input.setPlaceholderText('输入英语作文')
+        layout.addWidget(self.essay_input)
+
+        button_layout = QHBoxLayout()
+
+        self.save_essay_button = QPushButton('保存作文')
+        self.save_essay_button.clicked.connect(self.save_essay)
+        button_layout.addWidget(self.save_essay_button)
+
+        self.rebuild_index_button = QPushButton('重建例句索引')
+        self.rebuild_index_button.clicked.connect(lambda: self.start_essay_index_sync(True))
+        button_layout.addWidget(self.rebuild_index_button)
+
+        layout.addLayout(button_layout)
+
+        self.essay_index_label = QLabel('')
+        layout.addWidget(self.essay_index_label)
+
+        widget.setLayout(layout)
+
+        return widget
+
     def setup_database(self):
         """设置数据库连接"""
         if not self.db_manager.connect():
@@ -614,6 +553,9 @@ class MainWindow(QMainWindow):
         login_dialog = LoginDialog(self.db_manager)
         if login_dialog.exec() != QDialog.DialogCode.Accepted:
             sys.exit()
+
+        self.db_manager.open_essay_index()
+        self.start_essay_index_sync(False)
     
     def show_config(self):
         """显示配置对话框"""
@@ -622,6 +564,181 @@ class MainWindow(QMainWindow):
             # 重新连接数据库
             self.db_manager.connect()
     
+    def choose_backup_table(self, title):
+        """选择要导出 / 恢复的数据，取消时返回 None"""
+        tables = {'生词本': 'words', '作文': 'writing'}
+        name, ok = QInputDialog.getItem(self, title, '选择数据:', list(tables), 0, False)
+        return tables[name] if ok else None
+
+    def export_backup(self):
+        """导出生词本或作文"""
+        table = self.choose_backup_table('导出')
+        if not table:
+            return
+
+        filters = 'CSV (*.csv *.csv.gz);;JSONL (*.jsonl *.jsonl.gz)'
+        if table == 'words':
+            filters += ';;Anki 卡组 (*.apkg)'
+        path, _ = QFileDialog.getSaveFileName(self, '导出', f'{table}.csv', filters)
+        if path:
+            self.start_backup(self.db_manager.export_table, table, path, '导出')
+
+    def restore_backup(self):
+        """从备份恢复生词本或作文"""
+        table = self.choose_backup_table('恢复')
+        if not table:
+            return
+
+        path, _ = QFileDialog.getOpenFileName(
+            self, '恢复', '', '备份文件 (*.csv *.csv.gz *.jsonl *.jsonl.gz)')
+        if path:
+            self.start_backup(self.db_manager.restore_table, table, path, '恢复')
+
+    def start_backup(self, func, table, path, action):
+        """在后台线程中导出 / 恢复，期间禁用相关操作"""
+        self.export_action.setEnabled(False)
+        self.restore_action.setEnabled(False)
+        self.backup_progress_bar.show()
+        self.statusBar().showMessage(f'正在{action}...')
+
+        self.backup_worker = BackupWorker(func, table, path)
+        self.backup_worker.progress.connect(
+            lambda count: self.statusBar().showMessage(f'正在{action}... 已处理 {count} 条'))
+        self.backup_worker.result_ready.connect(
+            lambda success, message: self.finish_backup(action, success, message))
+        self.backup_worker.start()
+
+    def finish_backup(self, action, success, message):
+        """导出 / 恢复结束"""
+        self.export_action.setEnabled(True)
+        self.restore_action.setEnabled(True)
+        self.backup_progress_bar.hide()
+        self.statusBar().clearMessage()
+
+        if success:
+            QMessageBox.information(self, f'{action}完成', message)
+        else:
+            QMessageBox.warning(self, f'{action}失败', message)
+
+    def closeEvent(self, event):
+        # 导出 / 恢复或索引同步进行中时关闭窗口会中断写入
+        for name in ('backup_worker', 'essay_index_worker'):
+            worker = getattr(self, name, None)
+            if worker and worker.isRunning():
+                QMessageBox.warning(self, '提示', '后台任务进行中，请稍候')
+                event.ignore()
+                return
+        super().closeEvent(event)
+
+    def open_image(self):
+        """选择图片文件"""
+        path, _ = QFileDialog.getOpenFileName(
+            self, '选择图片', '', '图片 (*.png *.jpg *.jpeg *.bmp *.webp)')
+        if path:
+            self.start_image_translate(path)
+
+    def paste_image(self):
+        """从剪贴板读取截图"""
+        image = QApplication.clipboard().image()
+        if image.isNull():
+            QMessageBox.warning(self, '提示', '剪贴板中没有图片')
+            return
+
+        path = os.path.join(tempfile.gettempdir(), 'wordmem_clipboard.png')
+        image.save(path, 'PNG')
+        self.start_image_translate(path)
+
+    def start_image_translate(self, path):
+        """在后台线程中识别图片"""
+        self.open_image_button.setEnabled(False)
+        self.paste_image_button.setEnabled(False)
+        self.image_status_label.setText('正在识别...')
+        self.image_word_list.clear()
+
+        self.image_worker = ImageTranslateWorker(self.translator, path)
+        self.image_worker.result_ready.connect(self.show_image_words)
+        self.image_worker.start()
+
+    def show_image_words(self, words, error):
+        """显示识别结果"""
+        self.open_image_button.setEnabled(True)
+        self.paste_image_button.setEnabled(True)
+
+        if error and not words:
+            self.image_status_label.setText(error)
+            return
+
+        message = f'识别到 {len(words)} 个单词，点击勾选后添加'
+        self.image_status_label.setText(f'{message}（{error}）' if error else message)
+        for word in words:
+            if not word['translation']:
+                # 翻译失败的单词只显示，不能勾选
+                item = QListWidgetItem(f"{word['word']}    （翻译失败）")
+                item.setFlags(item.flags() & ~Qt.ItemFlag.ItemIsEnabled)
+                self.image_word_list.addItem(item)
+                continue
+            item = QListWidgetItem(f"{word['word']}    {word['translation']}")
+            item.setData(Qt.ItemDataRole.UserRole, word)
+            # 去掉默认的 ItemIsUserCheckable，勾选只由 toggle_image_word 处理，避免点到复选框时切换两次
+            item.setFlags(item.flags() & ~Qt.ItemFlag.ItemIsUserCheckable)
+            item.setCheckState(Qt.CheckState.Unchecked)
+            self.image_word_list.addItem(item)
+
+    def toggle_image_word(self, item):
+        """点击单词切换勾选状态"""
+        checked = item.checkState() == Qt.CheckState.Checked
+        item.setCheckState(Qt.CheckState.Unchecked if checked else Qt.CheckState.Checked)
+
+    def add_image_words(self):
+        """把勾选的单词一次性添加到生词本"""
+        items = [self.image_word_list.item(i) for i in range(self.image_word_list.count())]
+        words = [item.data(Qt.ItemDataRole.UserRole) for item in items
+                 if item.checkState() == Qt.CheckState.Checked]
+        if not words:
+            QMessageBox.warning(self, '提示', '请先点击选择要添加的单词')
+            return
+
+        success, message = self.db_manager.add_words(words)
+        if success:
+            QMessageBox.information(self, '成功', message)
+            for item in items:
+                item.setCheckState(Qt.CheckState.Unchecked)
+        else:
+            QMessageBox.warning(self, '失败', message)
+
+    def start_essay_index_sync(self, rebuild):
+        """在后台线程中同步作文索引，期间暂停保存作文"""
+        self.save_essay_button.setEnabled(False)
+        self.rebuild_index_button.setEnabled(False)
+        self.essay_index_label.setText('正在重建例句索引...' if rebuild else '正在同步例句索引...')
+
+        self.essay_index_worker = EssayIndexWorker(self.db_manager, rebuild)
+        self.essay_index_worker.result_ready.connect(self.finish_essay_index_sync)
+        self.essay_index_worker.start()
+
+    def finish_essay_index_sync(self, success, message):
+        self.save_essay_button.setEnabled(True)
+        self.rebuild_index_button.setEnabled(True)
+        self.essay_index_label.setText(message)
+
+    def save_essay(self):
+        """保存作文"""
+        essay = self.essay_input.toPlainText().strip()
+        if not essay:
+            QMessageBox.warning(self, '提示', '请输入作文')
+            return
+
+        success, message = self.db_manager.save_essay(essay)
+        if success:
+            QMessageBox.information(self, '成功', '作文已保存')
+            self.essay_input.clear()
+        else:
+            QMessageBox.warning(self, '失败', message)
+
+    def update_suggestions(self, text):
+        """根据输入更新补全候选"""
+        self.completer_model.setStringList(self.translator.suggest(text.strip()))
+
     def translate_word(self):
         """翻译单词"""
         word = self.word_input.text().strip()
@@ -657,7 +774,12 @@ class MainWindow(QMainWindow):
     
     def start_review(self):
         """开始复习"""
-        self.review_words = self.db_manager.get_words_for_review()
+        self.review_words, error = self.db_manager.get_words_for_review()
+        
+        if self.review_words is None:
+            self.review_words = []
+            QMessageBox.warning(self, '错误', error)
+            return
         
         if not self.review_words:
             QMessageBox.information(self, '提示', '今天没有需要复习的单词')
@@ -676,11 +798,14 @@ class MainWindow(QMainWindow):
             word = self.review_words[self.current_review_index]
             self.review_word_label.setText(word['word'])
             self.review_translation_label.setText('')
+            examples = self.db_manager.find_examples(word['word'])
+            self.review_context_label.setText('\n'.join(f'“{sentence}”' for sentence in examples))
             self.current_word = word
         else:
             # 复习完成
             self.review_word_label.setText('今日复习完成！')
             self.review_translation_label.setText('')
+            self.review_context_label.setText('')
             self.start_review_button.show()
     
     def show_translation(self):
@@ -696,6 +821,9 @@ class MainWindow(QMainWindow):
             self.show_review_word()
 
 def main():
+    # 打包后重建作文索引会启动子进程，需要先调用
+    multiprocessing.freeze_support()
+
     app = QApplication(sys.argv)
     
     # 设置应用程序样式
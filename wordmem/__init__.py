@@ -0,0 +1,9 @@
+"""
+单词记忆工具的核心（不依赖 PyQt6）
+图形界面见 main.py，命令行见 python -m wordmem
+"""
+from wordmem.config import Config
+from wordmem.database import DatabaseManager
+from wordmem.translator import Translator
+
+__all__ = ['Config', 'DatabaseManager', 'Translator']
@@ -0,0 +1,317 @@
+import argparse
+import json
+import os
+import sys
+
+from wordmem import Config, DatabaseManager, Translator
+from wordmem.database import BACKUP_TABLES
+from wordmem.utils.BackupUtil import chunked
+
+'''
+命令行入口（python -m wordmem），不导入 PyQt6 -
+    translate [WORD ...]    翻译单词，不带参数时从 stdin 逐行读取
+    add WORD [TRANSLATION]  添加一个单词，未给出翻译时自动翻译
+    import [FILE]           批量导入，FILE 省略时读取 stdin
+    due                     输出今天需要复习的单词
+    stats                   输出单词统计
+    export TABLE FILE       导出 words / writing 到 CSV、JSONL（.gz 压缩）或 Anki 卡组（仅 words）
+    restore TABLE FILE      从 CSV / JSONL 备份恢复 words / writing
+    deck create NAME [FILE] 创建共享词库并导入单词
+    deck add DECK [FILE]    向词库追加单词
+    deck clone DECK [USER ...]  把词库复制给学生，用户名也可以从 stdin 逐行读取，都省略时复制给自己
+    deck sync DECK          把词库重新同步给所有已订阅的学生（已有的单词自动跳过）
+    deck list               列出自己创建的词库
+
+    批量输入每行可以是纯文本单词、"单词<TAB>翻译" 或 JSON 对象 {"word": ..., "translation": ...}
+    批量输出每行一个 JSON 对象（JSONL），便于在管道中继续处理
+    登录信息通过 --user / --password 或环境变量 WORDMEM_USER / WORDMEM_PASSWORD 提供
+'''
+
+IMPORT_CHUNK_SIZE = 500
+
+
+def emit(obj):
+    sys.stdout.write(json.dumps(obj, ensure_ascii=False))
+    sys.stdout.write('\n')
+
+
+def parse_line(line):
+    """
+    把一行输入解析为 {'word': ..., 'translation': ...}，空行返回 None
+    格式错误时抛出 ValueError
+    """
+    line = line.strip()
+    if not line:
+        return None
+    if line.startswith('{'):
+        try:
+            item = json.loads(line)
+        except json.JSONDecodeError as e:
+            raise ValueError(f"JSON 格式错误: {e.msg}")
+        if not isinstance(item, dict) or not isinstance(item.get('word'), str):
+            raise ValueError("缺少 word 字段")
+        return {'word': item['word'].strip(), 'translation': item.get('translation'), 'type': item.get('type')}
+    word, _, translation = line.partition('\t')
+    return {'word': word.strip(), 'translation': translation.strip() or None, 'type': None}
+
+
+def iter_items(lines):
+    """逐行解析输入，无法解析的行产出带 error 字段的记录，不中断处理"""
+    for line in lines:
+        try:
+            item = parse_line(line)
+        except ValueError as e:
+            yield {'line': line.strip(), 'error': str(e)}
+            continue
+        if item and item['word']:
+            yield item
+
+
+def fill_translations(translator, items, chunk_size=IMPORT_CHUNK_SIZE):
+    """
+    按块为缺少翻译的条目补上翻译，翻译失败的条目带上 error 字段
+    每块中离线词典查不到的单词由 translate_words 并发联网翻译
+    """
+    for chunk in chunked(items, chunk_size):
+        pending = [item for item in chunk if not item.get('translation') and not item.get('error')]
+        translations = translator.translate_words(list(dict.fromkeys(item['word'] for item in pending)))
+        for item in pending:
+            item['translation'] = translations[item['word']]
+            if not item['translation']:
+                item['error'] = "翻译失败"
+        yield from chunk
+
+
+def open_session(args, config):
+    """连接数据库并登录"""
+    db_manager = DatabaseManager(config)
+    if not db_manager.connect():
+        raise SystemExit("未配置 Supabase，请先在 config.json 中填写 supabase_url 和 supabase_key")
+
+    username = args.user or os.environ.get('WORDMEM_USER')
+    password = args.password or os.environ.get('WORDMEM_PASSWORD')
+    if not username or not password:
+        raise SystemExit("请通过 --user/--password 或 WORDMEM_USER/WORDMEM_PASSWORD 提供登录信息")
+
+    success, message = db_manager.login(username, password)
+    if not success:
+        raise SystemExit(message)
+    return db_manager
+
+
+def cmd_translate(args, config):
+    translator = Translator(config)
+    lines = args.words if args.words else sys.stdin
+    for item in fill_translations(translator, iter_items(lines)):
+        emit(item)
+    return 0
+
+
+def cmd_add(args, config):
+    db_manager = open_session(args, config)
+    translation = args.translation
+    if not translation:
+        translation, error = Translator(config).translate(args.word, fallback=False)
+        if not translation:
+            print(error, file=sys.stderr)
+            return 1
+
+    word_type = 'phrase' if len(args.word.split()) > 1 else 'word'
+    success, message = db_manager.add_word(args.word, translation, word_type)
+    print(message, file=sys.stderr)
+    return 0 if success else 1
+
+
+def open_input(path):
+    """打开输入文件，省略或为 - 时使用 stdin"""
+    if path and path != '-':
+        return open(path, 'r', encoding='utf-8')
+    return sys.stdin
+
+
+def import_items(translator, path, save):
+    """
+    按块翻译并保存，save(items) 负责一次写入一块并返回 (success, message)
+    翻译失败的条目原样输出，不会写入
+    """
+    failed = 0
+    with open_input(path) as source:
+        for chunk in chunked(fill_translations(translator, iter_items(source)), IMPORT_CHUNK_SIZE):
+            ready = []
+            for item in chunk:
+                if item.get('error'):
+                    failed += 1
+                    emit(item)
+                else:
+                    ready.append(item)
+            success, message = save(ready)
+            emit({'imported': len(ready), 'message': message})
+            if not success:
+                return 1
+    return 1 if failed else 0
+
+
+def cmd_import(args, config):
+    db_manager = open_session(args, config)
+    return import_items(Translator(config), args.file, db_manager.add_words)
+
+
+def cmd_deck_create(args, config):
+    db_manager = open_session(args, config)
+    deck_id, error = db_manager.create_deck(args.name)
+    if not deck_id:
+        print(error, file=sys.stderr)
+        return 1
+    emit({'deck_id': deck_id, 'name': args.name})
+    if args.file is None and sys.stdin.isatty():
+        return 0
+    return import_items(Translator(config), args.file,
+                        lambda items: db_manager.add_deck_words(deck_id, items))
+
+
+def cmd_deck_add(args, config):
+    db_manager = open_session(args, config)
+    return import_items(Translator(config), args.file,
+                        lambda items: db_manager.add_deck_words(args.deck, items))
+
+
+def emit_deck_results(results, error):
+    if results is None:
+        print(error, file=sys.stderr)
+        return 1
+    for row in results:
+        emit(row)
+    return 0
+
+
+def cmd_deck_clone(args, config):
+    db_manager = open_session(args, config)
+    usernames = args.usernames
+    if not usernames and not sys.stdin.isatty():
+        usernames = [line.strip() for line in sys.stdin if line.strip()]
+    return emit_deck_results(*db_manager.clone_deck(args.deck, usernames))
+
+
+def cmd_deck_sync(args, config):
+    db_manager = open_session(args, config)
+    return emit_deck_results(*db_manager.sync_deck(args.deck))
+
+
+def cmd_deck_list(args, config):
+    db_manager = open_session(args, config)
+    decks, error = db_manager.list_decks()
+    if decks is None:
+        print(error, file=sys.stderr)
+        return 1
+    for deck in decks:
+        emit(deck)
+    return 0
+
+
+def cmd_due(args, config):
+    db_manager = open_session(args, config)
+    words, error = db_manager.get_words_for_review()
+    if words is None:
+        print(error, file=sys.stderr)
+        return 1
+    if args.limit:
+        words = words[:args.limit]
+    for word in words:
+        emit({key: word.get(key) for key in ('id', 'word', 'translation', 'type', 'review_count', 'next_review')})
+    return 0
+
+
+def cmd_stats(args, config):
+    db_manager = open_session(args, config)
+    emit({
+        'total': db_manager.count_words(),
+        'due': db_manager.count_words(due_only=True),
+        'reviewed': db_manager.count_words(reviewed_only=True),
+    })
+    return 0
+
+
+def print_progress(count):
+    print(f"已处理 {count} 条", file=sys.stderr)
+
+
+def cmd_export(args, config):
+    db_manager = open_session(args, config)
+    success, message = db_manager.export_table(args.table, args.file, progress=print_progress)
+    print(message, file=sys.stderr)
+    return 0 if success else 1
+
+
+def cmd_restore(args, config):
+    db_manager = open_session(args, config)
+    success, message = db_manager.restore_table(args.table, args.file, progress=print_progress)
+    print(message, file=sys.stderr)
+    return 0 if success else 1
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(prog='wordmem', description='单词记忆工具命令行')
+    parser.add_argument('-u', '--user', help='用户名（默认读取 WORDMEM_USER）')
+    parser.add_argument('-p', '--password', help='密码（默认读取 WORDMEM_PASSWORD）')
+    sub = parser.add_subparsers(dest='command', required=True)
+
+    p = sub.add_parser('translate', help='翻译单词，输出 JSONL')
+    p.add_argument('words', nargs='*', help='要翻译的单词，省略时从 stdin 读取')
+    p.set_defaults(func=cmd_translate)
+
+    p = sub.add_parser('add', help='添加一个单词')
+    p.add_argument('word')
+    p.add_argument('translation', nargs='?')
+    p.set_defaults(func=cmd_add)
+
+    p = sub.add_parser('import', help='批量导入单词')
+    p.add_argument('file', nargs='?', help='输入文件，省略或为 - 时读取 stdin')
+    p.set_defaults(func=cmd_import)
+
+    p = sub.add_parser('due', help='列出今天需要复习的单词')
+    p.add_argument('-n', '--limit', type=int, default=0, help='最多输出的数量')
+    p.set_defaults(func=cmd_due)
+
+    p = sub.add_parser('stats', help='单词统计')
+    p.set_defaults(func=cmd_stats)
+
+    p = sub.add_parser('export', help='导出数据')
+    p.add_argument('table', choices=sorted(BACKUP_TABLES))
+    p.add_argument('file', help='输出文件，扩展名决定格式')
+    p.set_defaults(func=cmd_export)
+
+    p = sub.add_parser('restore', help='从备份恢复数据')
+    p.add_argument('table', choices=sorted(BACKUP_TABLES))
+    p.add_argument('file', help='CSV / JSONL 备份文件')
+    p.set_defaults(func=cmd_restore)
+
+    deck = sub.add_parser('deck', help='共享词库').add_subparsers(dest='deck_command', required=True)
+
+    p = deck.add_parser('create', help='创建词库并导入单词')
+    p.add_argument('name')
+    p.add_argument('file', nargs='?', help='单词文件，为 - 时读取 stdin')
+    p.set_defaults(func=cmd_deck_create)
+
+    p = deck.add_parser('add', help='向词库追加单词')
+    p.add_argument('deck', help='词库 id')
+    p.add_argument('file', nargs='?', help='单词文件，省略或为 - 时读取 stdin')
+    p.set_defaults(func=cmd_deck_add)
+
+    p = deck.add_parser('clone', help='把词库复制给学生')
+    p.add_argument('deck', help='词库 id')
+    p.add_argument('usernames', nargs='*', help='学生用户名，省略时复制给自己')
+    p.set_defaults(func=cmd_deck_clone)
+
+    p = deck.add_parser('sync', help='把词库重新同步给已订阅的学生')
+    p.add_argument('deck', help='词库 id')
+    p.set_defaults(func=cmd_deck_sync)
+
+    p = deck.add_parser('list', help='列出自己创建的词库')
+    p.set_defaults(func=cmd_deck_list)
+
+    return parser
+
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+    return args.func(args, Config())
@@ -0,0 +1,39 @@
+import json
+import os
+
+# 配置文件
+CONFIG_FILE = "config.json"
+# 离线词典（由 build_dict.py 生成）
+DEFAULT_OFFLINE_DICT = os.path.join("dict", "ecdict.bin")
+
+
+class Config:
+    """配置管理类"""
+    def __init__(self):
+        self.supabase_url = ""
+        self.supabase_key = ""
+        self.youdao_app_key = ""
+        self.youdao_app_secret = ""
+        self.offline_dict_path = DEFAULT_OFFLINE_DICT
+        self.load_config()
+    
+    def load_config(self):
+        if os.path.exists(CONFIG_FILE):
+            with open(CONFIG_FILE, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+                self.supabase_url = data.get('supabase_url', '')
+                self.supabase_key = data.get('supabase_key', '')
+                self.youdao_app_key = data.get('youdao_app_key', '')
+                self.youdao_app_secret = data.get('youdao_app_secret', '')
+                self.offline_dict_path = data.get('offline_dict_path', DEFAULT_OFFLINE_DICT)
+    
+    def save_config(self):
+        data = {
+            'supabase_url': self.supabase_url,
+            'supabase_key': self.supabase_key,
+            'youdao_app_key': self.youdao_app_key,
+            'youdao_app_secret': self.youdao_app_secret,
+            'offline_dict_path': self.offline_dict_path
+        }
+        with open(CONFIG_FILE, 'w', encoding='utf-8') as f:
+            json.dump(data, f, ensure_ascii=False, indent=2)
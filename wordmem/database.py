@@ -0,0 +1,506 @@
+import hashlib
+import os
+from datetime import datetime, timedelta
+
+from wordmem.essay_index import EssayIndex
+from wordmem.utils.BackupUtil import chunked, detect_format, export_rows, read_rows, report_progress
+from wordmem.utils.RetryUtil import FIRST_JITTER, call_with_retry
+
+# 导出 / 恢复支持的表：导出的列，以及恢复时 upsert 的冲突键
+BACKUP_TABLES = {
+    'words': {
+        'columns': 'id, word, translation, type, created_at, review_count, last_review, next_review',
+        'on_conflict': 'user_id,word',
+        # 恢复到其他账号时 id 可能冲突，按 (user_id, word) 去重即可
+        'drop': ('id',),
+    },
+    'writing': {
+        'columns': '*',
+        'on_conflict': 'id',
+        # 保留 id，重复恢复同一份备份不会产生重复的作文；id 属于其他账号的行会作为新作文插入
+        'drop': (),
+    },
+}
+
+# writing 表中的作文原文列（建表时未加引号，PostgreSQL 会把 rawEssay 转成小写）
+ESSAY_COLUMN = 'rawessay'
+# 本地作文索引目录
+ESSAY_INDEX_DIR = "index"
+# PostgreSQL 唯一约束冲突的错误码
+UNIQUE_VIOLATION = '23505'
+
+
+class DatabaseManager:
+    """数据库管理类"""
+    def __init__(self, config):
+        self.config = config
+        self.supabase = None
+        self.user_id = None
+        self.essay_index = None
+        # 本次运行中验证过的凭据：用户名 -> (用户 id, 密码哈希)
+        self.credentials = {}
+        
+    def connect(self):
+        """连接到 Supabase"""
+        if self.config.supabase_url and self.config.supabase_key:
+            # 延迟导入：supabase 客户端较重，命令行只在需要访问数据库时才加载
+            from supabase import create_client
+            self.supabase = create_client(self.config.supabase_url, self.config.supabase_key)
+            return True
+        return False
+    
+    def verify_credentials(self, username, password_hash, first_jitter=FIRST_JITTER):
+        """
+        校验用户名和密码哈希，返回 (用户 id, 错误信息)
+        first_jitter 为请求前的随机等待上限，作为同一操作中的后续请求调用时传入 0
+        """
+        # 本次运行中已验证过的凭据直接通过，不再访问数据库
+        cached = self.credentials.get(username)
+        if cached and cached[1] == password_hash:
+            return cached[0], None
+
+        # 只取验证需要的列
+        result = call_with_retry(lambda: self.supabase.table('users').select('id, password_hash')
+                                 .eq('username', username).limit(1).execute(),
+                                 first_jitter=first_jitter)
+
+        if not result.data:
+            return None, "用户不存在"
+
+        user = result.data[0]
+        if user['password_hash'] != password_hash:
+            return None, "密码错误"
+
+        self.credentials[username] = (user['id'], password_hash)
+        return user['id'], None
+
+    def login(self, username, password):
+        """用户登录"""
+        if not self.supabase:
+            return False, "数据库未连接"
+
+        # 简单的密码验证（实际应用中应使用更安全的方式）
+        password_hash = hashlib.sha256(password.encode()).hexdigest()
+
+        try:
+            user_id, error = self.verify_credentials(username, password_hash)
+        except Exception as e:
+            return False, f"登录失败: {str(e)}"
+
+        if not user_id:
+            return False, error
+
+        self.user_id = user_id
+        return True, "登录成功"
+
+    def register(self, username, password):
+        """用户注册"""
+        if not self.supabase:
+            return False, "数据库未连接"
+
+        password_hash = hashlib.sha256(password.encode()).hexdigest()
+        user_data = {
+            'username': username,
+            'password_hash': password_hash,
+            'created_at': datetime.now().isoformat()
+        }
+
+        try:
+            # 直接插入，用户名是否重复由唯一约束判断，只需一次请求
+            result = call_with_retry(lambda: self.supabase.table('users').insert(user_data).execute())
+
+            if result.data:
+                self.credentials[username] = (result.data[0]['id'], password_hash)
+                return True, "注册成功"
+            else:
+                return False, "注册失败"
+
+        except Exception as e:
+            if str(getattr(e, 'code', '')) != UNIQUE_VIOLATION:
+                return False, f"注册失败: {str(e)}"
+
+        # 重试时上一次插入可能已经成功，凭据一致就视为注册成功
+        try:
+            user_id, _ = self.verify_credentials(username, password_hash, first_jitter=0)
+        except Exception:
+            user_id = None
+        if user_id:
+            return True, "注册成功"
+        return False, "用户名已存在"
+
+    def add_word(self, word, translation, word_type='word'):
+        """添加单词或短语"""
+        if not self.supabase or not self.user_id:
+            return False, "请先登录"
+        
+        try:
+            word_data = {
+                'user_id': self.user_id,
+                'word': word,
+                'translation': translation,
+                'type': word_type,
+                'created_at': datetime.now().isoformat(),
+                'review_count': 0,
+                'last_review': None,
+                'next_review': datetime.now().isoformat()
+            }
+            
+            result = self.supabase.table('words').insert(word_data).execute()
+            
+            if result.data:
+                return True, "添加成功"
+            else:
+                return False, "添加失败"
+                
+        except Exception as e:
+            return False, f"添加失败: {str(e)}"
+    
+    def add_words(self, words):
+        """
+        批量添加单词，一次请求完成
+        words 为 [{'word': ..., 'translation': ..., 'type': ...}, ...]，已存在的单词会被跳过
+        """
+        if not self.supabase or not self.user_id:
+            return False, "请先登录"
+
+        if not words:
+            return True, "添加 0 个，跳过 0 个"
+
+        try:
+            now = datetime.now().isoformat()
+            rows = [{
+                'user_id': self.user_id,
+                'word': item['word'],
+                'translation': item['translation'],
+                'type': item.get('type') or ('phrase' if len(item['word'].split()) > 1 else 'word'),
+                'created_at': now,
+                'review_count': 0,
+                'last_review': None,
+                'next_review': now
+            } for item in words]
+
+            result = self.supabase.table('words').upsert(
+                rows, on_conflict='user_id,word', ignore_duplicates=True).execute()
+
+            inserted = len(result.data or [])
+            return True, f"添加 {inserted} 个，跳过 {len(rows) - inserted} 个"
+
+        except Exception as e:
+            return False, f"添加失败: {str(e)}"
+
+    def create_deck(self, name):
+        """创建共享词库，返回 (词库 id, 错误信息)"""
+        if not self.supabase or not self.user_id:
+            return None, "请先登录"
+
+        try:
+            result = self.supabase.table('decks').insert({'owner_id': self.user_id, 'name': name}).execute()
+            if result.data:
+                return result.data[0]['id'], None
+            return None, "创建词库失败"
+        except Exception as e:
+            return None, f"创建词库失败: {str(e)}"
+
+    def list_decks(self):
+        """列出自己创建的词库，返回 (词库列表, 错误信息)"""
+        if not self.supabase or not self.user_id:
+            return None, "请先登录"
+
+        try:
+            result = self.supabase.table('decks').select('id, name, created_at').eq('owner_id', self.user_id).execute()
+            return result.data or [], None
+        except Exception as e:
+            return None, f"获取词库失败: {str(e)}"
+
+    def add_deck_words(self, deck_id, words):
+        """向词库批量添加单词（一次请求），已存在的单词会被跳过"""
+        if not self.supabase or not self.user_id:
+            return False, "请先登录"
+
+        if not words:
+            return True, "添加 0 个，跳过 0 个"
+
+        try:
+            rows = [{
+                'deck_id': deck_id,
+                'word': item['word'],
+                'translation': item['translation'],
+                'type': item.get('type') or ('phrase' if len(item['word'].split()) > 1 else 'word')
+            } for item in words]
+
+            result = self.supabase.table('deck_words').upsert(
+                rows, on_conflict='deck_id,word', ignore_duplicates=True).execute()
+
+            inserted = len(result.data or [])
+            return True, f"添加 {inserted} 个，跳过 {len(rows) - inserted} 个"
+
+        except Exception as e:
+            return False, f"添加失败: {str(e)}"
+
+    def clone_deck(self, deck_id, usernames=None):
+        """
+        把词库复制到学生的生词本，usernames 省略时复制给自己
+        复制在服务端完成，每个学生一条 INSERT ... SELECT，已有的单词会被跳过；只有词库创建者可以调用
+        返回 ([{'username': ..., 'inserted': ..., 'skipped': ...}, ...], 错误信息)
+        """
+        if not self.supabase or not self.user_id:
+            return None, "请先登录"
+
+        try:
+            if usernames:
+                result = self.supabase.table('users').select('id, username').in_('username', list(usernames)).execute()
+                names = {row['id']: row['username'] for row in result.data or []}
+                missing = set(usernames) - set(names.values())
+                if missing:
+                    return None, f"用户不存在: {', '.join(sorted(missing))}"
+            else:
+                names = {self.user_id: None}
+
+            result = self.supabase.rpc('clone_deck', {
+                'p_deck_id': deck_id,
+                'p_user_ids': list(names),
+                'p_owner_id': self.user_id
+            }).execute()
+            return self._deck_results(result.data, names), None
+
+        except Exception as e:
+            return None, f"复制词库失败: {str(e)}"
+
+    def sync_deck(self, deck_id):
+        """把词库中新增的单词同步给所有已订阅的学生"""
+        if not self.supabase or not self.user_id:
+            return None, "请先登录"
+
+        try:
+            result = self.supabase.rpc('sync_deck', {'p_deck_id': deck_id, 'p_owner_id': self.user_id}).execute()
+            return self._deck_results(result.data, {}), None
+        except Exception as e:
+            return None, f"同步词库失败: {str(e)}"
+
+    def _deck_results(self, rows, names):
+        return [{
+            'user_id': row['student_id'],
+            'username': names.get(row['student_id']),
+            'inserted': row['inserted_count'],
+            'skipped': row['skipped_count']
+        } for row in rows or []]
+
+    def count_words(self, due_only=False, reviewed_only=False):
+        """统计当前用户的单词数"""
+        query = self.supabase.table('words').select('id', count='exact').eq('user_id', self.user_id)
+        if due_only:
+            query = query.lte('next_review', datetime.now().isoformat())
+        if reviewed_only:
+            query = query.gt('review_count', 0)
+        return query.limit(1).execute().count or 0
+
+    def get_words_for_review(self):
+        """获取需要复习的单词，返回 (单词列表, 错误信息)"""
+        if not self.supabase or not self.user_id:
+            return None, "请先登录"
+        
+        try:
+            # 获取今天需要复习的单词
+            today = datetime.now().isoformat()
+            result = self.supabase.table('words').select("*").eq('user_id', self.user_id).lte('next_review', today).execute()
+            
+            return result.data or [], None
+            
+        except Exception as e:
+            return None, f"获取复习单词失败: {str(e)}"
+    
+    def update_review(self, word_id, remembered):
+        """更新复习记录"""
+        if not self.supabase:
+            return False
+        
+        try:
+            # 获取当前单词信息
+            result = self.supabase.table('words').select("*").eq('id', word_id).execute()
+            
+            if not result.data:
+                return False
+            
+            word = result.data[0]
+            review_count = word['review_count'] + 1
+            
+            # 根据记忆情况计算下次复习时间
+            if remembered:
+                # 记住了，增加间隔时间
+                days = min(2 ** review_count, 30)  # 最多30天
+            else:
+                # 没记住，重置
+                days = 1
+                review_count = 0
+            
+            next_review = (datetime.now() + timedelta(days=days)).isoformat()
+            
+            # 更新数据
+            update_data = {
+                'review_count': review_count,
+                'last_review': datetime.now().isoformat(),
+                'next_review': next_review
+            }
+            
+            self.supabase.table('words').update(update_data).eq('id', word_id).execute()
+            
+            return True
+            
+        except Exception as e:
+            print(f"更新复习记录失败: {str(e)}")
+            return False
+
+    def open_essay_index(self):
+        """打开当前用户的本地作文索引（只读本地文件，与云端的同步见 sync_essay_index）"""
+        if not self.user_id:
+            return False
+        if self.essay_index:
+            self.essay_index.close()
+        self.essay_index = EssayIndex(os.path.join(ESSAY_INDEX_DIR, f"essays_{self.user_id}.db"))
+        return True
+
+    def sync_essay_index(self, rebuild=False):
+        """
+        与 writing 表同步作文索引（较慢，应在后台线程中调用）
+        从未构建过或 rebuild 为 True 时全量重建，否则只对比作文 id，补齐其他设备新增的作文并删除已不存在的
+        """
+        if not self.supabase or not self.essay_index:
+            return False, "请先登录"
+
+        try:
+            if rebuild or not self.essay_index.is_built():
+                rows = self.iter_rows('writing', columns=f'id, {ESSAY_COLUMN}')
+                count = self.essay_index.rebuild((row['id'], row.get(ESSAY_COLUMN)) for row in rows)
+                return True, f"已索引 {count} 篇作文"
+
+            remote_ids = {row['id'] for row in self.iter_rows('writing', columns='id')}
+            local_ids = self.essay_index.essay_ids()
+            added = []
+            for chunk in chunked(sorted(remote_ids - local_ids), 100):
+                result = self.supabase.table('writing').select(f'id, {ESSAY_COLUMN}').in_('id', chunk).execute()
+                added.extend((row['id'], row.get(ESSAY_COLUMN)) for row in result.data or [])
+            added_count, removed_count = self.essay_index.apply(added, local_ids - remote_ids)
+            return True, f"新增 {added_count} 篇，删除 {removed_count} 篇"
+        except Exception as e:
+            print(f"同步作文索引失败: {str(e)}")
+            return False, f"同步作文索引失败: {str(e)}"
+
+    def save_essay(self, raw_essay):
+        """保存作文，并更新本地索引"""
+        if not self.supabase or not self.user_id:
+            return False, "请先登录"
+
+        try:
+            essay_data = {
+                'user_id': self.user_id,
+                ESSAY_COLUMN: raw_essay
+            }
+
+            result = self.supabase.table('writing').insert(essay_data).execute()
+
+            if not result.data:
+                return False, "保存失败"
+
+            if self.essay_index:
+                self.essay_index.add_essay(result.data[0]['id'], raw_essay)
+            return True, "保存成功"
+
+        except Exception as e:
+            return False, f"保存失败: {str(e)}"
+
+    def find_examples(self, word, limit=3):
+        """查找自己作文中用过该单词的句子"""
+        if not self.essay_index:
+            return []
+        return self.essay_index.lookup(word, limit)
+
+    def iter_rows(self, table, page_size=1000, columns=None):
+        """按 id 做 keyset 分页，逐行产出当前用户在 table 中的数据，columns 省略时取导出用的列"""
+        columns = columns or BACKUP_TABLES[table]['columns']
+        last_id = None
+        while True:
+            query = self.supabase.table(table).select(columns).eq('user_id', self.user_id)
+            if last_id is not None:
+                query = query.gt('id', last_id)
+            rows = query.order('id').limit(page_size).execute().data or []
+            # PostgREST 可能按 max-rows 截断单页结果，不足 page_size 不代表已到末尾，只有空页才结束
+            if not rows:
+                return
+            yield from rows
+            last_id = rows[-1]['id']
+
+    def _foreign_ids(self, table, ids):
+        """ids 中已被其他账号使用的 id"""
+        ids = list(ids)
+        if not ids:
+            return set()
+        result = self.supabase.table(table).select('id').in_('id', ids).neq('user_id', self.user_id).execute()
+        return {row['id'] for row in result.data or []}
+
+    def upsert_rows(self, table, rows):
+        """把一批行写入当前用户名下，当前用户已存在的行会被覆盖"""
+        spec = BACKUP_TABLES[table]
+        keys = spec['on_conflict'].split(',')
+        # 同一批中冲突键重复会导致 upsert 整批失败，只保留每个键的最后一行
+        data = {}
+        for row in rows:
+            row = {key: value for key, value in row.items() if key not in spec['drop']}
+            row['user_id'] = self.user_id
+            data[tuple(row.get(key) for key in keys)] = row
+        rows = list(data.values())
+
+        # 按 id 冲突时只能覆盖自己的行：id 已属于其他账号的行去掉 id 后作为新行插入，
+        # 否则把别人的备份恢复到自己名下会覆盖原账号的数据
+        foreign = []
+        if keys == ['id']:
+            foreign_ids = self._foreign_ids(table, (row['id'] for row in rows if row.get('id')))
+            foreign = [{key: value for key, value in row.items() if key != 'id'}
+                       for row in rows if row.get('id') in foreign_ids]
+            rows = [row for row in rows if row.get('id') not in foreign_ids]
+
+        if rows:
+            self.supabase.table(table).upsert(rows, on_conflict=spec['on_conflict']).execute()
+        if foreign:
+            self.supabase.table(table).insert(foreign).execute()
+        return len(rows) + len(foreign)
+
+    def export_table(self, table, path, progress=None):
+        """
+        流式导出 table 到 CSV / JSONL / Anki 卡组包
+        progress(count) 会在导出过程中被周期性调用
+        """
+        if not self.supabase or not self.user_id:
+            return False, "请先登录"
+
+        try:
+            if detect_format(path) == 'apkg' and table != 'words':
+                return False, "只有生词本可以导出为 Anki 卡组"
+
+            rows = self.iter_rows(table)
+            if progress:
+                rows = report_progress(rows, progress)
+            count = export_rows(rows, path)
+            return True, f"已导出 {count} 条记录"
+        except Exception as e:
+            return False, f"导出失败: {str(e)}"
+
+    def restore_table(self, table, path, chunk_size=500, progress=None):
+        """从 CSV / JSONL 备份流式恢复，按块批量 upsert，每块完成后调用 progress(count)"""
+        if not self.supabase or not self.user_id:
+            return False, "请先登录"
+
+        count = 0
+        try:
+            for chunk in chunked(read_rows(path), chunk_size):
+                count += self.upsert_rows(table, chunk)
+                if progress:
+                    progress(count)
+        except Exception as e:
+            return False, f"恢复失败（已恢复 {count} 条）: {str(e)}"
+
+        message = f"已恢复 {count} 条记录"
+        if table == 'writing' and self.essay_index:
+            # 恢复的作文立即加入例句索引，不必等到下次登录
+            success, index_message = self.sync_essay_index()
+            message = f"{message}，{index_message}"
+        return True, message
@@ -0,0 +1,247 @@
+import os
+import re
+import sqlite3
+import threading
+from collections import defaultdict
+from concurrent.futures import ProcessPoolExecutor
+
+'''
+作文倒排索引 -
+    规范化后的单词 -> [(作文 id, 句子 id, 句内偏移), ...]
+    索引保存在本地 sqlite 中，打开时整体载入内存的 dict，复习时按单词查找例句无需扫描作文
+    内存中另外记录 作文 id -> (句子数, 单词集合)，更新一篇作文时只需处理它自己的数据
+    保存作文时增量更新；登录后与云端对账补齐其他设备保存的作文；也可以批量重建
+'''
+
+TOKEN_PATTERN = re.compile(r"[A-Za-z]+(?:'[A-Za-z]+)*")
+SENTENCE_PATTERN = re.compile(r"[^.!?\n]+[.!?]*")
+# 作文数达到该值时才启用进程池：切分一篇作文只需几十微秒，
+# 而子进程启动（Windows 上还要重新导入主模块）要几百毫秒
+PARALLEL_THRESHOLD = 5000
+# 单词规范化规则变化时递增，旧版本的本地索引会在下次同步时自动重建
+INDEX_VERSION = '2'
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS meta (
+    key TEXT PRIMARY KEY,
+    value TEXT
+);
+CREATE TABLE IF NOT EXISTS essays (
+    essay_id TEXT PRIMARY KEY,
+    sent_count INTEGER NOT NULL
+);
+CREATE TABLE IF NOT EXISTS sentences (
+    essay_id TEXT NOT NULL,
+    sent_id INTEGER NOT NULL,
+    text TEXT NOT NULL,
+    PRIMARY KEY (essay_id, sent_id)
+);
+CREATE TABLE IF NOT EXISTS postings (
+    token TEXT NOT NULL,
+    essay_id TEXT NOT NULL,
+    sent_id INTEGER NOT NULL,
+    offset INTEGER NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_postings_essay_id ON postings(essay_id);
+"""
+
+
+def normalize_token(token):
+    """
+    单词规范化：只转小写并去掉所有格
+    不去复数词尾，否则 news/new、does/doe 这类不相关的单词会共用同一个索引项
+    """
+    token = token.lower()
+    if token.endswith("'s"):
+        token = token[:-2]
+    return token
+
+
+def split_sentences(text):
+    """切分句子，返回去掉首尾空白的句子列表"""
+    return [s.strip() for s in SENTENCE_PATTERN.findall(text) if s.strip()]
+
+
+def index_essay(essay):
+    """
+    为一篇作文生成索引数据（可在子进程中运行）
+    essay 为 (作文 id, 原文)，返回 (作文 id, [句子], [(单词, 句子 id, 偏移), ...])
+    """
+    essay_id, text = essay
+    sentences = split_sentences(text or '')
+    postings = []
+    for sent_id, sentence in enumerate(sentences):
+        for match in TOKEN_PATTERN.finditer(sentence):
+            postings.append((normalize_token(match.group()), sent_id, match.start()))
+    return essay_id, sentences, postings
+
+
+def match_phrase(sentence, offset, tokens, key):
+    """句子中偏移 offset 处的单词为 tokens[key]，判断它前后的单词是否与短语一致"""
+    words = [(m.start(), normalize_token(m.group())) for m in TOKEN_PATTERN.finditer(sentence)]
+    positions = [start for start, _ in words]
+    try:
+        start = positions.index(offset) - key
+    except ValueError:
+        return False
+    if start < 0:
+        return False
+    return [token for _, token in words[start:start + len(tokens)]] == tokens
+
+
+class EssayIndex:
+    """本地持久化的作文倒排索引（可在后台线程中更新）"""
+    def __init__(self, path):
+        self.path = path
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        # 重建 / 同步在后台线程中进行，所有数据库访问都在 lock 内完成
+        self.lock = threading.Lock()
+        self.conn = sqlite3.connect(path, check_same_thread=False)
+        self.conn.executescript(SCHEMA)
+        self.load()
+
+    def load(self):
+        """把索引整体载入内存"""
+        postings = defaultdict(list)
+        sentences = {}
+        essays = {}
+        for essay_id, sent_count in self.conn.execute('SELECT essay_id, sent_count FROM essays'):
+            essays[essay_id] = (sent_count, set())
+        for essay_id, sent_id, text in self.conn.execute('SELECT essay_id, sent_id, text FROM sentences'):
+            sentences[(essay_id, sent_id)] = text
+        for token, essay_id, sent_id, offset in self.conn.execute(
+                'SELECT token, essay_id, sent_id, offset FROM postings'):
+            postings[token].append((essay_id, sent_id, offset))
+            essays[essay_id][1].add(token)
+        self._swap(postings, sentences, essays)
+
+    def _swap(self, postings, sentences, essays):
+        # 整体替换引用，查询线程不会看到构建到一半的索引
+        self.postings, self.sentences, self.essays = postings, sentences, essays
+
+    def is_built(self):
+        """是否已经用当前版本的规则从云端完整构建过"""
+        row = self.conn.execute("SELECT value FROM meta WHERE key = 'version'").fetchone()
+        return row is not None and row[0] == INDEX_VERSION
+
+    def essay_ids(self):
+        """已索引的作文 id"""
+        return set(self.essays)
+
+    def close(self):
+        with self.lock:
+            self.conn.close()
+
+    def _forget(self, essay_id):
+        """从内存中删除一篇作文，只处理这篇作文中出现过的单词"""
+        sent_count, tokens = self.essays.pop(essay_id, (0, ()))
+        for token in tokens:
+            entries = [p for p in self.postings.get(token, ()) if p[0] != essay_id]
+            if entries:
+                self.postings[token] = entries
+            else:
+                self.postings.pop(token, None)
+        for sent_id in range(sent_count):
+            self.sentences.pop((essay_id, sent_id), None)
+
+    def _store(self, essay_id, sentences, postings, index):
+        """写入一篇作文的索引数据（调用方负责提交事务），index 为要更新的内存索引"""
+        memory_postings, memory_sentences, memory_essays = index
+        self.conn.execute('INSERT INTO essays (essay_id, sent_count) VALUES (?, ?)', (essay_id, len(sentences)))
+        self.conn.executemany(
+            'INSERT INTO sentences (essay_id, sent_id, text) VALUES (?, ?, ?)',
+            ((essay_id, sent_id, text) for sent_id, text in enumerate(sentences)))
+        self.conn.executemany(
+            'INSERT INTO postings (token, essay_id, sent_id, offset) VALUES (?, ?, ?, ?)',
+            ((token, essay_id, sent_id, offset) for token, sent_id, offset in postings))
+        for sent_id, text in enumerate(sentences):
+            memory_sentences[(essay_id, sent_id)] = text
+        tokens = set()
+        memory_essays[essay_id] = (len(sentences), tokens)
+        for token, sent_id, offset in postings:
+            memory_postings[token].append((essay_id, sent_id, offset))
+            tokens.add(token)
+
+    def _delete(self, essay_id):
+        self.conn.execute('DELETE FROM essays WHERE essay_id = ?', (essay_id,))
+        self.conn.execute('DELETE FROM sentences WHERE essay_id = ?', (essay_id,))
+        self.conn.execute('DELETE FROM postings WHERE essay_id = ?', (essay_id,))
+        self._forget(essay_id)
+
+    def add_essay(self, essay_id, text):
+        """新增或更新一篇作文的索引"""
+        result = index_essay((essay_id, text))
+        with self.lock, self.conn:
+            self._delete(essay_id)
+            self._store(*result, (self.postings, self.sentences, self.essays))
+
+    def remove_essay(self, essay_id):
+        """删除一篇作文的索引"""
+        with self.lock, self.conn:
+            self._delete(essay_id)
+
+    def apply(self, added, removed):
+        """
+        增量同步：added 为新增的 (作文 id, 原文) 序列，removed 为要删除的作文 id
+        用于同步在其他设备或命令行保存的作文
+        """
+        results = [index_essay(essay) for essay in added]
+        with self.lock, self.conn:
+            for essay_id in removed:
+                self._delete(essay_id)
+            for result in results:
+                self._delete(result[0])
+                self._store(*result, (self.postings, self.sentences, self.essays))
+        return len(results), len(removed)
+
+    def rebuild(self, essays, workers=None):
+        """
+        由全部作文重建索引，essays 为 (作文 id, 原文) 序列
+        作文很多时才用进程池并行切分句子和单词
+        """
+        essays = list(essays)
+        if len(essays) >= PARALLEL_THRESHOLD:
+            with ProcessPoolExecutor(max_workers=workers) as pool:
+                results = list(pool.map(index_essay, essays, chunksize=64))
+        else:
+            results = [index_essay(essay) for essay in essays]
+
+        index = (defaultdict(list), {}, {})
+        with self.lock, self.conn:
+            self.conn.execute('DELETE FROM essays')
+            self.conn.execute('DELETE FROM sentences')
+            self.conn.execute('DELETE FROM postings')
+            for result in results:
+                self._store(*result, index)
+            self.conn.execute("INSERT OR REPLACE INTO meta (key, value) VALUES ('built_at', datetime('now'))")
+            self.conn.execute("INSERT OR REPLACE INTO meta (key, value) VALUES ('version', ?)", (INDEX_VERSION,))
+        self._swap(*index)
+        return len(results)
+
+    def lookup(self, word, limit=3):
+        """查找用过该单词或短语的句子，返回句子列表"""
+        tokens = [normalize_token(m.group()) for m in TOKEN_PATTERN.finditer(word)]
+        if not tokens:
+            return []
+
+        postings = self.postings
+        # 短语按其中最少见的单词查索引，再用该单词的偏移确认前后的单词依次相同
+        key = min(range(len(tokens)), key=lambda i: len(postings.get(tokens[i], ())))
+        results = []
+        seen = set()
+        for essay_id, sent_id, offset in postings.get(tokens[key], ()):
+            sentence = self.sentences.get((essay_id, sent_id))
+            if sentence is None:
+                # 该作文正在后台线程中被更新
+                continue
+            if (essay_id, sent_id) in seen:
+                continue
+            if len(tokens) > 1 and not match_phrase(sentence, offset, tokens, key):
+                continue
+            seen.add((essay_id, sent_id))
+            results.append(sentence)
+            if len(results) >= limit:
+                break
+        return results
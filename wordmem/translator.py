@@ -0,0 +1,242 @@
+import base64
+import json
+import os
+import re
+from concurrent.futures import ThreadPoolExecutor
+
+try:
+    from translator_free import FreeTranslator
+except ImportError:
+    FreeTranslator = None
+
+from wordmem.utils.AuthV3Util import addAuthParams
+from wordmem.utils.ImageUtil import image_hash, prepare_image
+from wordmem.utils.OfflineDictUtil import OfflineDict
+
+# 图片取词结果缓存目录（按图片哈希）
+IMAGE_CACHE_DIR = os.path.join("cache", "ocr")
+# 从识别出的文字中提取英文单词
+WORD_PATTERN = re.compile(r"[A-Za-z]+(?:['-][A-Za-z]+)*")
+# 联网翻译的并发数
+TRANSLATE_WORKERS = 4
+
+
+class Translator:
+    """翻译类"""
+    def __init__(self, config):
+        self.config = config
+        self.free_translator = FreeTranslator() if FreeTranslator else None
+        self.offline_dict = self.load_offline_dict()
+        self.image_cache = {}
+
+    def load_offline_dict(self):
+        """打开离线词典（文件不存在或格式错误时返回 None）"""
+        path = self.config.offline_dict_path
+        if not path or not os.path.exists(path):
+            return None
+        try:
+            return OfflineDict(path)
+        except (OSError, ValueError) as e:
+            print(f"加载离线词典失败: {str(e)}")
+            return None
+
+    def translate_offline(self, text):
+        """查询离线词典"""
+        if not self.offline_dict:
+            return None, "未加载离线词典"
+        translation = self.offline_dict.lookup(text)
+        if translation:
+            return translation, None
+        return None, "离线词典中没有该词条"
+
+    def suggest(self, prefix, limit=10):
+        """按前缀从离线词典中查找候选单词（用于自动补全）"""
+        if not self.offline_dict:
+            return []
+        return [word for word, _ in self.offline_dict.prefix(prefix, limit)]
+    
+    def translate_youdao(self, text):
+        """使用有道翻译API"""
+        if not self.config.youdao_app_key or not self.config.youdao_app_secret:
+            return None, "未配置有道翻译API"
+        
+        try:
+            # 延迟导入 requests，离线查询时不必加载
+            import requests
+
+            app_key = self.config.youdao_app_key
+            app_secret = self.config.youdao_app_secret
+            
+            # # 生成参数
+            # salt = str(uuid.uuid4())
+            # curtime = str(int(time.time()))
+            #
+            # # 生成签名
+            # sign_str = app_key + text + salt + curtime + app_secret
+            # sign = hashlib.sha256(sign_str.encode()).hexdigest()
+            #
+            # 请求参数
+            params = {
+                'q': text,
+                'from': 'auto',
+                'to': 'zh-CHS',
+            }
+
+            addAuthParams(app_key, app_secret, params)
+
+            # 发送请求
+            response = requests.post('https://openapi.youdao.com/api', params=params, timeout=5)
+            result = response.json()
+            
+            if result.get('errorCode') == '0':
+                translation = result.get('translation', [''])[0]
+                return translation, None
+            else:
+                return None, f"翻译失败: {result.get('errorCode')}"
+                
+        except Exception as e:
+            return None, f"翻译失败: {str(e)}"
+    
+    def ocr_youdao(self, image_data):
+        """使用有道通用文字识别API，返回识别出的文本行"""
+        if not self.config.youdao_app_key or not self.config.youdao_app_secret:
+            return None, "未配置有道翻译API"
+
+        try:
+            import requests
+
+            params = {
+                'img': base64.b64encode(image_data).decode('ascii'),
+                'langType': 'en',
+                'detectType': '10012',
+                'imageType': '1',
+                'docType': 'json',
+            }
+
+            addAuthParams(self.config.youdao_app_key, self.config.youdao_app_secret, params)
+
+            # 图片较大，放在请求体中发送
+            response = requests.post('https://openapi.youdao.com/ocrapi', data=params, timeout=15)
+            result = response.json()
+
+            if result.get('errorCode') != '0':
+                return None, f"识别失败: {result.get('errorCode')}"
+
+            lines = []
+            for region in result.get('Result', {}).get('regions', []):
+                for line in region.get('lines', []):
+                    lines.append(line.get('text', ''))
+            return lines, None
+
+        except Exception as e:
+            return None, f"识别失败: {str(e)}"
+
+    def read_image_cache(self, cache_path):
+        """读取磁盘缓存，文件损坏时返回 None"""
+        try:
+            with open(cache_path, 'r', encoding='utf-8') as f:
+                words = json.load(f)
+        except (OSError, ValueError):
+            return None
+        return words if isinstance(words, list) else None
+
+    def write_image_cache(self, cache_path, words):
+        """先写临时文件再替换，避免留下写了一半的缓存"""
+        tmp_path = cache_path + '.tmp'
+        try:
+            os.makedirs(IMAGE_CACHE_DIR, exist_ok=True)
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                json.dump(words, f, ensure_ascii=False)
+            os.replace(tmp_path, cache_path)
+        except OSError as e:
+            print(f"写入图片取词缓存失败: {str(e)}")
+
+    def translate_words(self, words):
+        """
+        批量翻译单词，返回 {单词: 翻译}，翻译失败的为 None
+        离线词典查不到的单词并发地联网翻译
+        """
+        results = {}
+        missing = []
+        for word in words:
+            results[word], _ = self.translate_offline(word)
+            if not results[word]:
+                missing.append(word)
+
+        if missing:
+            with ThreadPoolExecutor(max_workers=TRANSLATE_WORKERS) as pool:
+                translated = pool.map(lambda w: self.translate(w, fallback=False)[0], missing)
+                results.update(zip(missing, translated))
+        return results
+
+    def translate_image(self, path, crop=None):
+        """
+        图片取词：识别图片中的英文单词并逐个翻译
+        返回 ([{'word': ..., 'translation': ...}, ...], error)
+        只有全部单词都翻译成功时才按图片哈希缓存；否则未翻译的单词 translation 为 None，并返回错误信息
+        """
+        try:
+            with open(path, 'rb') as f:
+                raw = f.read()
+        except OSError as e:
+            return None, f"读取图片失败: {str(e)}"
+
+        key = image_hash(raw, crop)
+        if key in self.image_cache:
+            return self.image_cache[key], None
+
+        cache_path = os.path.join(IMAGE_CACHE_DIR, key + '.json')
+        words = self.read_image_cache(cache_path)
+        if words is not None:
+            self.image_cache[key] = words
+            return words, None
+
+        try:
+            image_data = prepare_image(raw, crop)
+        except Exception as e:
+            return None, f"处理图片失败: {str(e)}"
+
+        lines, error = self.ocr_youdao(image_data)
+        if lines is None:
+            return None, error
+
+        # 去重并保持出现顺序
+        found = list(dict.fromkeys(match.lower() for line in lines for match in WORD_PATTERN.findall(line)))
+        translations = self.translate_words(found)
+        words = [{'word': word, 'translation': translations[word]} for word in found]
+
+        failed = [word for word in found if not translations[word]]
+        if failed:
+            return words, f"{len(failed)} 个单词翻译失败，请稍后重试"
+
+        self.image_cache[key] = words
+        self.write_image_cache(cache_path, words)
+        return words, None
+
+    def translate_simple(self, word):
+        """简单的单词翻译（可以后续接入词典API）"""
+        # 这里可以集成免费的词典API或者本地词典
+        # 暂时返回示例
+        return f"{word} 的中文翻译", None
+    
+    def translate(self, text, fallback=True):
+        """统一的翻译接口，fallback 为 False 时不返回示例翻译"""
+        # 优先查询离线词典，无需联网
+        result, error = self.translate_offline(text)
+        if result:
+            return result, None
+
+        # 其次使用免费翻译
+        if self.free_translator:
+            result, error = self.free_translator.translate(text)
+            if result:
+                return result, None
+        
+        # 如果免费翻译失败，尝试有道翻译
+        if self.config.youdao_app_key:
+            return self.translate_youdao(text)
+        
+        # 最后使用简单翻译
+        if not fallback:
+            return None, error
+        return self.translate_simple(text)
@@ -0,0 +1,232 @@
+import csv
+import gzip
+import hashlib
+import html
+import itertools
+import json
+import os
+import sqlite3
+import tempfile
+import time
+import zipfile
+
+'''
+导出 / 备份 -
+    所有读写都以生成器逐行进行，不在内存中保留整张表：
+        导出: DatabaseManager.iter_rows -> write_csv / write_jsonl / write_apkg
+        恢复: read_rows -> chunked -> DatabaseManager.upsert_rows
+    文件名以 .gz 结尾时（如 words.jsonl.gz）自动进行 gzip 压缩 / 解压
+'''
+
+FORMATS = ('csv', 'jsonl', 'apkg')
+
+
+def detect_format(path):
+    """根据文件扩展名判断格式"""
+    name = path.lower()
+    if name.endswith('.gz'):
+        name = name[:-3]
+    for fmt in FORMATS:
+        if name.endswith('.' + fmt):
+            return fmt
+    raise ValueError(f"不支持的文件格式: {path}")
+
+
+def open_text(path, mode):
+    """打开文本文件，.gz 结尾时透明地进行 gzip 压缩 / 解压"""
+    if path.lower().endswith('.gz'):
+        return gzip.open(path, mode + 't', encoding='utf-8', newline='')
+    return open(path, mode, encoding='utf-8', newline='')
+
+
+def chunked(iterable, size):
+    """把可迭代对象切分为不超过 size 的列表"""
+    iterator = iter(iterable)
+    while True:
+        chunk = list(itertools.islice(iterator, size))
+        if not chunk:
+            return
+        yield chunk
+
+
+def report_progress(rows, callback, every=1000):
+    """透传 rows，每经过 every 行调用一次 callback(已处理行数)"""
+    count = 0
+    for row in rows:
+        yield row
+        count += 1
+        if count % every == 0:
+            callback(count)
+
+
+def write_csv(rows, path):
+    """写入 CSV，表头取第一行的字段"""
+    rows = iter(rows)
+    first = next(rows, None)
+    count = 0
+    with open_text(path, 'w') as f:
+        if first is None:
+            return 0
+        writer = csv.DictWriter(f, fieldnames=list(first.keys()), extrasaction='ignore')
+        writer.writeheader()
+        for row in itertools.chain([first], rows):
+            writer.writerow(row)
+            count += 1
+    return count
+
+
+def write_jsonl(rows, path):
+    """每行一个 JSON 对象"""
+    count = 0
+    with open_text(path, 'w') as f:
+        for row in rows:
+            f.write(json.dumps(row, ensure_ascii=False))
+            f.write('\n')
+            count += 1
+    return count
+
+
+def read_rows(path):
+    """逐行读取 CSV / JSONL 备份文件"""
+    fmt = detect_format(path)
+    with open_text(path, 'r') as f:
+        if fmt == 'csv':
+            for row in csv.DictReader(f):
+                # CSV 无法区分空字符串与 NULL，统一按 NULL 处理
+                yield {key: (value if value != '' else None) for key, value in row.items()}
+        elif fmt == 'jsonl':
+            for line in f:
+                if line.strip():
+                    yield json.loads(line)
+        else:
+            raise ValueError(f"{fmt} 格式不支持恢复")
+
+
+# Anki 2.0 collection 的表结构（schema 11）
+ANKI_SCHEMA = """
+CREATE TABLE col (id integer primary key, crt integer not null, mod integer not null,
+    scm integer not null, ver integer not null, dty integer not null, usn integer not null,
+    ls integer not null, conf text not null, models text not null, decks text not null,
+    dconf text not null, tags text not null);
+CREATE TABLE notes (id integer primary key, guid text not null, mid integer not null,
+    mod integer not null, usn integer not null, tags text not null, flds text not null,
+    sfld integer not null, csum integer not null, flags integer not null, data text not null);
+CREATE TABLE cards (id integer primary key, nid integer not null, did integer not null,
+    ord integer not null, mod integer not null, usn integer not null, type integer not null,
+    queue integer not null, due integer not null, ivl integer not null, factor integer not null,
+    reps integer not null, lapses integer not null, left integer not null, odue integer not null,
+    odid integer not null, flags integer not null, data text not null);
+CREATE TABLE revlog (id integer primary key, cid integer not null, usn integer not null,
+    ease integer not null, ivl integer not null, lastIvl integer not null, factor integer not null,
+    time integer not null, type integer not null);
+CREATE TABLE graves (usn integer not null, oid integer not null, type integer not null);
+CREATE INDEX ix_notes_usn on notes (usn);
+CREATE INDEX ix_cards_usn on cards (usn);
+CREATE INDEX ix_revlog_usn on revlog (usn);
+CREATE INDEX ix_cards_nid on cards (nid);
+CREATE INDEX ix_cards_sched on cards (did, queue, due);
+CREATE INDEX ix_revlog_cid on revlog (cid);
+CREATE INDEX ix_notes_csum on notes (csum);
+"""
+
+
+def _anki_collection(deck_id, model_id, deck_name, now):
+    """col 表中唯一一行的内容"""
+    model = {
+        'id': model_id, 'name': 'WordMemory', 'type': 0, 'mod': now, 'usn': -1,
+        'sortf': 0, 'did': deck_id, 'tags': [], 'vers': [],
+        'flds': [
+            {'name': name, 'ord': i, 'sticky': False, 'rtl': False, 'font': 'Arial', 'size': 20, 'media': []}
+            for i, name in enumerate(['Word', 'Translation'])
+        ],
+        'tmpls': [{
+            'name': 'Card 1', 'ord': 0, 'did': None, 'bqfmt': '', 'bafmt': '',
+            'qfmt': '{{Word}}',
+            'afmt': '{{FrontSide}}<hr id=answer>{{Translation}}',
+        }],
+        'css': '.card { font-family: arial; font-size: 20px; text-align: center; }',
+        'latexPre': '', 'latexPost': '', 'req': [[0, 'all', [0]]],
+    }
+
+    def deck(did, name):
+        return {
+            'id': did, 'name': name, 'mod': now, 'usn': -1, 'desc': '', 'dyn': 0, 'conf': 1,
+            'collapsed': False, 'extendNew': 10, 'extendRev': 50,
+            'newToday': [0, 0], 'revToday': [0, 0], 'lrnToday': [0, 0], 'timeToday': [0, 0],
+        }
+
+    dconf = {
+        'id': 1, 'name': 'Default', 'mod': 0, 'usn': 0, 'maxTaken': 60, 'autoplay': True,
+        'timer': 0, 'replayq': True, 'dyn': False,
+        'new': {'delays': [1, 10], 'ints': [1, 4, 7], 'initialFactor': 2500, 'order': 1, 'perDay': 20, 'bury': True},
+        'rev': {'perDay': 100, 'ease4': 1.3, 'fuzz': 0.05, 'ivlFct': 1, 'maxIvl': 36500, 'bury': True},
+        'lapse': {'delays': [10], 'mult': 0, 'minInt': 1, 'leechFails': 8, 'leechAction': 0},
+    }
+    conf = {
+        'nextPos': 1, 'estTimes': True, 'activeDecks': [1], 'sortType': 'noteFld', 'timeLim': 0,
+        'sortBackwards': False, 'addToCur': True, 'curDeck': 1, 'newBury': True, 'newSpread': 0,
+        'dueCounts': True, 'curModel': str(model_id), 'collapseTime': 1200,
+    }
+    return (
+        1, now, now * 1000, now * 1000, 11, 0, 0, 0,
+        json.dumps(conf), json.dumps({str(model_id): model}),
+        json.dumps({'1': deck(1, 'Default'), str(deck_id): deck(deck_id, deck_name)}),
+        json.dumps({'1': dconf}), json.dumps({}),
+    )
+
+
+def write_apkg(rows, path, deck_name='WordMemory'):
+    """
+    导出为 Anki 卡组包（.apkg）
+    collection 写在临时 sqlite 文件中，逐行插入，再整体压缩进 zip
+    """
+    now = int(time.time())
+    base_id = now * 1000
+    deck_id = base_id + 1
+    model_id = base_id + 2
+
+    fd, db_path = tempfile.mkstemp(suffix='.anki2')
+    os.close(fd)
+    count = 0
+    try:
+        conn = sqlite3.connect(db_path)
+        try:
+            conn.executescript(ANKI_SCHEMA)
+            conn.execute('INSERT INTO col VALUES (?,?,?,?,?,?,?,?,?,?,?,?,?)',
+                         _anki_collection(deck_id, model_id, deck_name, now))
+            for row in rows:
+                count += 1
+                word = html.escape(row.get('word') or '')
+                translation = html.escape(row.get('translation') or '').replace('\n', '<br>')
+                note_id = base_id + count
+                guid = hashlib.sha1(f"{deck_name}\x1f{word}".encode('utf-8')).hexdigest()[:10]
+                csum = int(hashlib.sha1(word.encode('utf-8')).hexdigest()[:8], 16)
+                tags = ' phrase ' if row.get('type') == 'phrase' else ''
+                conn.execute('INSERT INTO notes VALUES (?,?,?,?,?,?,?,?,?,?,?)',
+                             (note_id, guid, model_id, now, -1, tags,
+                              f"{word}\x1f{translation}", word, csum, 0, ''))
+                conn.execute('INSERT INTO cards VALUES (?,?,?,?,?,?,?,?,?,?,?,?,?,?,?,?,?,?)',
+                             (note_id, note_id, deck_id, 0, now, -1, 0, 0, count,
+                              0, 0, 0, 0, 0, 0, 0, 0, ''))
+            conn.commit()
+        finally:
+            conn.close()
+
+        with zipfile.ZipFile(path, 'w', zipfile.ZIP_DEFLATED) as z:
+            z.write(db_path, 'collection.anki2')
+            z.writestr('media', '{}')
+    finally:
+        os.remove(db_path)
+    return count
+
+
+def export_rows(rows, path):
+    """按文件扩展名选择格式导出，返回导出的行数"""
+    fmt = detect_format(path)
+    if fmt == 'csv':
+        return write_csv(rows, path)
+    if fmt == 'jsonl':
+        return write_jsonl(rows, path)
+    if path.lower().endswith('.gz'):
+        raise ValueError("apkg 本身已是压缩包，不支持再 gzip 压缩")
+    return write_apkg(rows, path, os.path.splitext(os.path.basename(path))[0])
@@ -0,0 +1,63 @@
+import hashlib
+import io
+
+try:
+    from PIL import Image, ImageOps
+except ImportError:
+    Image = None
+
+'''
+图片预处理 -
+    上传 OCR 之前在本地完成：按 EXIF 旋正 -> 灰度 -> 裁掉空白边距 -> 缩小 -> JPEG 重新编码
+    文字识别不需要颜色和高分辨率，处理后的图片通常只有原图的几十分之一
+'''
+
+MAX_SIDE = 1600
+JPEG_QUALITY = 70
+# 灰度值与背景相差超过该阈值才算内容，用于裁掉纸张边缘
+CROP_THRESHOLD = 40
+CROP_PADDING = 8
+
+
+def image_hash(data, crop=None):
+    """原始图片字节（及裁剪区域）的哈希，作为缓存键"""
+    h = hashlib.sha256(data)
+    if crop:
+        h.update(repr(tuple(crop)).encode())
+    return h.hexdigest()
+
+
+def auto_crop(gray):
+    """裁掉四周的空白（浅色背景）区域"""
+    mask = ImageOps.invert(gray).point(lambda p: 255 if p > CROP_THRESHOLD else 0)
+    bbox = mask.getbbox()
+    if not bbox:
+        return gray
+    left, top, right, bottom = bbox
+    return gray.crop((
+        max(left - CROP_PADDING, 0),
+        max(top - CROP_PADDING, 0),
+        min(right + CROP_PADDING, gray.width),
+        min(bottom + CROP_PADDING, gray.height),
+    ))
+
+
+def prepare_image(data, crop=None, max_side=MAX_SIDE, quality=JPEG_QUALITY):
+    """
+    压缩待识别的图片，返回 JPEG 字节
+    crop 为 (left, top, right, bottom)，省略时自动裁掉空白边距
+    """
+    if Image is None:
+        raise RuntimeError("未安装 Pillow，无法处理图片")
+
+    with Image.open(io.BytesIO(data)) as img:
+        img = ImageOps.exif_transpose(img)
+        gray = img.convert('L')
+
+    gray = gray.crop(crop) if crop else auto_crop(gray)
+    # thumbnail 只缩小不放大，并保持宽高比
+    gray.thumbnail((max_side, max_side), Image.Resampling.LANCZOS)
+
+    out = io.BytesIO()
+    gray.save(out, format='JPEG', quality=quality, optimize=True)
+    return out.getvalue()
@@ -0,0 +1,125 @@
+import mmap
+import os
+import struct
+
+'''
+离线词典 -
+    二进制格式（小端）:
+        header : magic(8 字节) + 词条数 count(uint32) + 保留(uint32)
+        offsets: (count + 1) 个 uint32，第 i 个词条位于 blob[offsets[i]:offsets[i + 1]]
+        blob   : 词条依次拼接，每个词条为 utf-8 编码的 key + b'\\0' + 释义
+
+    key 为小写后的单词，按 utf-8 字节序排序，查询时直接在 mmap 上二分，
+    打开文件不需要解析，常驻内存只有操作系统按需换入的页。
+'''
+
+MAGIC = b'WMDICT1\0'
+HEADER = struct.Struct('<8sII')
+OFFSET = struct.Struct('<I')
+
+
+def normalize_key(word):
+    """词条 key 的统一规范化"""
+    return word.strip().lower()
+
+
+class OfflineDict:
+    """基于 mmap 的只读离线词典"""
+    def __init__(self, path):
+        self.path = path
+        with open(path, 'rb') as f:
+            self._mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, self.count, _ = HEADER.unpack_from(self._mm, 0)
+        if magic != MAGIC:
+            self._mm.close()
+            raise ValueError(f"不是有效的离线词典文件: {path}")
+        self._offsets_start = HEADER.size
+        self._blob_start = self._offsets_start + (self.count + 1) * OFFSET.size
+
+    def close(self):
+        self._mm.close()
+
+    def __len__(self):
+        return self.count
+
+    def _entry(self, i):
+        """返回第 i 个词条的 (key, 释义起始位置, 结束位置)，均为 mmap 中的绝对位置"""
+        pos = self._offsets_start + i * OFFSET.size
+        start = self._blob_start + OFFSET.unpack_from(self._mm, pos)[0]
+        end = self._blob_start + OFFSET.unpack_from(self._mm, pos + OFFSET.size)[0]
+        sep = self._mm.find(b'\0', start, end)
+        return self._mm[start:sep], sep + 1, end
+
+    def _key(self, i):
+        return self._entry(i)[0]
+
+    def _bisect_left(self, key):
+        lo, hi = 0, self.count
+        while lo < hi:
+            mid = (lo + hi) // 2
+            if self._key(mid) < key:
+                lo = mid + 1
+            else:
+                hi = mid
+        return lo
+
+    def lookup(self, word):
+        """精确查询，找不到返回 None"""
+        key = normalize_key(word).encode('utf-8')
+        if not key:
+            return None
+        i = self._bisect_left(key)
+        if i < self.count:
+            found, start, end = self._entry(i)
+            if found == key:
+                return self._mm[start:end].decode('utf-8')
+        return None
+
+    def prefix(self, text, limit=10):
+        """前缀查询（用于自动补全），返回 [(单词, 释义), ...]"""
+        key = normalize_key(text).encode('utf-8')
+        if not key:
+            return []
+        results = []
+        i = self._bisect_left(key)
+        while i < self.count and len(results) < limit:
+            found, start, end = self._entry(i)
+            if not found.startswith(key):
+                break
+            results.append((found.decode('utf-8'), self._mm[start:end].decode('utf-8')))
+            i += 1
+        return results
+
+
+def build_dict(entries, path):
+    """
+    由 (单词, 释义) 序列生成离线词典文件
+    重复的单词只保留第一次出现的释义，返回写入的词条数
+    """
+    table = {}
+    for word, translation in entries:
+        key = normalize_key(word)
+        if not key or not translation or '\0' in key or key in table:
+            continue
+        table[key] = translation.replace('\0', '')
+
+    # 按 utf-8 字节序排序，与查询时的比较方式一致
+    records = sorted((key.encode('utf-8'), value.encode('utf-8')) for key, value in table.items())
+    directory = os.path.dirname(path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+
+    tmp_path = path + '.tmp'
+    with open(tmp_path, 'wb') as f:
+        f.write(HEADER.pack(MAGIC, len(records), 0))
+        offset = 0
+        for key, value in records:
+            f.write(OFFSET.pack(offset))
+            offset += len(key) + 1 + len(value)
+        f.write(OFFSET.pack(offset))
+        for key, value in records:
+            f.write(key)
+            f.write(b'\0')
+            f.write(value)
+    os.replace(tmp_path, path)
+    return len(records)
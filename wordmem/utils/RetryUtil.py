@@ -0,0 +1,84 @@
+import random
+import time
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+
+'''
+请求错峰与重试 -
+    每次用户操作的第一个请求前随机等待 0 ~ FIRST_JITTER 秒，全班同时点击登录时把请求分散开
+    （同一操作中后续的请求传入 first_jitter=0，不再重复等待）
+    网络错误、429、5xx 以及 PostgREST 连不上数据库的错误（PGRST000/001/003）视为暂时性错误，
+    按指数退避并加随机抖动（full jitter）后重试，避免所有客户端在同一时刻一起重试；
+    服务端返回 Retry-After 时至少等待该时长，超过 MAX_RETRY_AFTER 则不再重试
+'''
+
+MAX_ATTEMPTS = 4
+FIRST_JITTER = 0.5
+BASE_DELAY = 0.3
+MAX_DELAY = 3.0
+MAX_RETRY_AFTER = 30.0
+TRANSIENT_CODES = {
+    '408', '429', '500', '502', '503', '504',
+    # PostgREST：无法连接数据库 / 数据库连接中断 / 连接池等待超时
+    'PGRST000', 'PGRST001', 'PGRST003',
+}
+
+
+def status_code(error):
+    """错误对应的 HTTP 状态码或 PostgREST 错误码"""
+    response = getattr(error, 'response', None)
+    if getattr(response, 'status_code', None) is not None:
+        return str(response.status_code)
+    return str(getattr(error, 'code', ''))
+
+
+def is_transient(error):
+    """判断错误是否值得重试"""
+    if isinstance(error, (ConnectionError, TimeoutError)):
+        return True
+    try:
+        import httpx
+        if isinstance(error, httpx.TransportError):
+            return True
+    except ImportError:
+        pass
+    return status_code(error) in TRANSIENT_CODES
+
+
+def retry_after(error):
+    """解析响应中的 Retry-After（秒数或 HTTP 日期），没有时返回 None"""
+    headers = getattr(getattr(error, 'response', None), 'headers', None)
+    value = headers.get('Retry-After') if headers else None
+    if not value:
+        return None
+    try:
+        return max(float(value), 0.0)
+    except ValueError:
+        pass
+    try:
+        when = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    if when.tzinfo is None:
+        when = when.replace(tzinfo=timezone.utc)
+    return max((when - datetime.now(timezone.utc)).total_seconds(), 0.0)
+
+
+def call_with_retry(func, attempts=MAX_ATTEMPTS, base_delay=BASE_DELAY, max_delay=MAX_DELAY,
+                    first_jitter=FIRST_JITTER):
+    """错峰调用 func，遇到暂时性错误时带抖动地重试"""
+    if first_jitter:
+        time.sleep(random.uniform(0, first_jitter))
+    for attempt in range(attempts):
+        try:
+            return func()
+        except Exception as e:
+            if attempt == attempts - 1 or not is_transient(e):
+                raise
+            delay = random.uniform(0, min(max_delay, base_delay * 2 ** attempt))
+            wait = retry_after(e)
+            if wait is not None:
+                if wait > MAX_RETRY_AFTER:
+                    raise
+                delay = max(delay, wait)
+        time.sleep(delay)